@@ -4,189 +4,1478 @@ Aethir CLI Automation using Typer
 Replaces expect-based automation with a more reliable Python approach
 """
 
-import typer
-import subprocess
+from __future__ import annotations
+
 import json
 import os
 import time
 import sys
-from pathlib import Path
-from typing import Optional, Dict, Any
+
+import json_files
+import license_history
+import metrics_store
+import wallet_store
+
+# Configuration (the AETHIR_* environment overrides let benchmarks and CI point
+# the automation at a stand-in CLI and a scratch runtime directory)
+AETHIR_CLI_PATH = os.environ.get("AETHIR_CLI_PATH", "/root/AethirCheckerCLI-linux/AethirCheckerCLI")
+WALLET_JSON_PATH = os.environ.get("AETHIR_WALLET_PATH", "/root/wallet.json")
+INSTALL_SCRIPT_PATH = os.environ.get("AETHIR_INSTALL_SCRIPT", "/root/AethirCheckerCLI-linux/install.sh")
+RUNTIME_DIR = os.environ.get("AETHIR_RUNTIME_DIR", "/run/aethir")
+# Unlike RUNTIME_DIR this survives reboots
+STATE_DIR = os.environ.get("AETHIR_STATE_DIR", "/var/lib/aethir")
+CHECKER_SOCKET_PATH = os.path.join(RUNTIME_DIR, "checker.sock")
+STATUS_SOCKET_PATH = os.path.join(RUNTIME_DIR, "status.sock")
+LICENSE_CACHE_PATH = os.path.join(RUNTIME_DIR, "license-status.json")
+LICENSE_LOCK_PATH = os.path.join(RUNTIME_DIR, "license-status.lock")
+LICENSE_CACHE_TTL = float(os.environ.get("AETHIR_LICENSE_TTL", "60"))
+# Longest wait after a failed background refresh before the next one (capped at the TTL)
+LICENSE_RETRY_BACKOFF = 60
+WALLET_SENT_FLAG_PATH = "/tmp/wallet_sent_to_orchestrator"
+RIPTIDE_MANAGER_SERVICE = "aethir-riptide-manager"
+CHECKER_SERVICE = "aethir-checker"
+RIPTIDE_CONFIG_PATH = "/root/riptide.config.json"
+INSTANCES_DIR = "/root/aethir-instances"
+PROVISION_REPORT_PATH = os.path.join(RUNTIME_DIR, "provision-report.json")
+BOOT_TIMELINE_PATH = os.path.join(RUNTIME_DIR, "boot-timeline.json")
+# Locks and results of CLI queries shared by concurrent callers, see single_flight()
+CLI_FLIGHT_DIR = os.path.join(RUNTIME_DIR, "cli-flight")
+METRICS_STATE_PATH = os.path.join(RUNTIME_DIR, "metrics.json")
+LICENSE_HISTORY_PATH = os.path.join(STATE_DIR, "license-history.bin")
+# CLI watchdog: a session is hung once its CLI prints nothing for the inactivity
+# timeout while a command is waiting; after BREAKER_THRESHOLD consecutive hangs no
+# new CLI is spawned until BREAKER_COOLDOWN seconds have passed
+CLI_INACTIVITY_TIMEOUT = float(os.environ.get("AETHIR_CLI_INACTIVITY_TIMEOUT", "60"))
+CLI_KILL_GRACE = 5
+CLI_BREAKER_PATH = os.path.join(RUNTIME_DIR, "cli-breaker.json")
+BREAKER_THRESHOLD = int(os.environ.get("AETHIR_BREAKER_THRESHOLD", "3"))
+BREAKER_COOLDOWN = float(os.environ.get("AETHIR_BREAKER_COOLDOWN", "300"))
+
+# The helpers below back the machine-readable commands hooks call every few
+# seconds. They run on the fast-start path before typer and the CLI engine
+# are imported, so they may only use the modules imported above.
+
+def read_license_cache() -> Optional[Dict[str, Any]]:
+    """Return the cached license status entry, or None if there is none yet"""
+    try:
+        with open(LICENSE_CACHE_PATH, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def open_license_lock() -> int:
+    """Open the lock file that makes license refreshes single-flight across processes"""
+    os.makedirs(os.path.dirname(LICENSE_LOCK_PATH), exist_ok=True)
+    return os.open(LICENSE_LOCK_PATH, os.O_RDWR | os.O_CREAT, 0o600)
+
+
+def spawn_license_refresh() -> bool:
+    """Start a background refresh unless one is already running.
+    
+    The flock is taken here and the locked descriptor is handed to the child,
+    so there is no window in which a second caller could start another refresh.
+    """
+    import fcntl
+    import subprocess
+    
+    lock_fd = open_license_lock()
+    try:
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "refresh-license-status", "--lock-fd", str(lock_fd)],
+            pass_fds=(lock_fd,),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+        return True
+    finally:
+        os.close(lock_fd)
+
+
+def read_breaker_state() -> Dict[str, Any]:
+    """Persisted circuit breaker state shared by every process that spawns the CLI"""
+    try:
+        with open(CLI_BREAKER_PATH, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"consecutive_hangs": 0, "trips": 0}
+
+
+def breaker_status(state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """closed: CLI spawns allowed; open: refused until open_until; half_open: cool-down
+    over, the next spawn is the trial that either closes the breaker or reopens it"""
+    state = read_breaker_state() if state is None else state
+    hangs = state.get("consecutive_hangs", 0)
+    open_until = state.get("open_until") or 0
+    if hangs < BREAKER_THRESHOLD:
+        breaker_state = "closed"
+    elif open_until > time.time():
+        breaker_state = "open"
+    else:
+        breaker_state = "half_open"
+    status_data = {"state": breaker_state, "consecutive_hangs": hangs, "trips": state.get("trips", 0)}
+    if breaker_state == "open":
+        status_data["open_until"] = time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime(open_until))
+        status_data["retry_in_seconds"] = round(open_until - time.time(), 1)
+    if state.get("last_hang"):
+        status_data["last_hang"] = time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime(state["last_hang"]))
+    return status_data
+
+
+def license_status_response(entry: Optional[Dict[str, Any]], ttl: float) -> Dict[str, Any]:
+    """Build the license-status JSON from a cache entry, including its freshness"""
+    if not entry or "data" not in entry:
+        license_data = {
+            "checking": 0,
+            "ready": 0,
+            "offline": 0,
+            "banned": 0,
+            "pending": 0,
+            "total_delegated": 0,
+            "status": "cli_unavailable",
+            "message": (entry or {}).get("last_error", "License status not fetched yet"),
+            "online_total": 0,
+            "offline_total": 0,
+            "cli_accessible": False,
+            "cached": False
+        }
+        return license_data
+    
+    age = time.time() - entry["fetched_at"]
+    license_data = dict(entry["data"])
+    license_data.update({
+        "cli_accessible": "last_error" not in entry,
+        "cached": True,
+        "age_seconds": round(age, 1),
+        "stale": age > ttl,
+        "last_check": time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime(entry["fetched_at"]))
+    })
+    if "last_error" in entry:
+        license_data["last_error"] = entry["last_error"]
+    return license_data
+
+
+def cached_license_status(ttl: float = LICENSE_CACHE_TTL) -> Optional[Dict[str, Any]]:
+    """Answer from the cache when it holds a value; None when a blocking fetch is needed"""
+    entry = read_license_cache()
+    if entry is None or "data" not in entry:
+        return None
+    if license_refresh_due(entry, ttl):
+        # Stale while revalidate: answer with the last good value right away
+        spawn_license_refresh()
+    return license_status_response(entry, ttl)
+
+
+def license_refresh_due(entry: Optional[Dict[str, Any]], ttl: float) -> bool:
+    """Whether a background refresh should start: data missing or stale, backoff over, breaker not open"""
+    now = time.time()
+    if entry and "data" in entry and now - entry["fetched_at"] <= ttl:
+        return False
+    # While refreshes keep failing, the last attempt rather than the last success paces the retries
+    if entry and now - entry.get("last_attempt", 0) <= min(ttl, LICENSE_RETRY_BACKOFF):
+        return False
+    return breaker_status()["state"] != "open"
+
+
+def basic_status_data() -> Dict[str, Any]:
+    """Collect basic Aethir status without running CLI"""
+    status_data = {
+        "wallet_exists": False,
+        "cli_exists": os.path.exists(AETHIR_CLI_PATH),
+        "install_script_exists": os.path.exists(INSTALL_SCRIPT_PATH),
+        "cli_breaker": breaker_status(),
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime())
+    }
+    
+    # Check wallet content if it exists
+    try:
+        wallet_data = wallet_store.read_wallet(WALLET_JSON_PATH)
+        if wallet_data is not None:
+            status_data["wallet_exists"] = True
+            status_data["wallet_has_keys"] = wallet_store.has_keys(wallet_data)
+            status_data["public_key_preview"] = wallet_data.get("public_key", "")[:8] + "..." if wallet_data.get("public_key") else None
+    except Exception as e:
+        status_data["wallet_exists"] = True
+        status_data["wallet_error"] = str(e)
+    
+    return status_data
+
+
+def status_report() -> list[str]:
+    """Human-readable status lines for the status command"""
+    lines = ["📊 Aethir Status Check"]
+    
+    # Check CLI binary
+    if os.path.exists(AETHIR_CLI_PATH):
+        lines.append("✅ Aethir CLI binary found")
+    else:
+        lines.append("❌ Aethir CLI binary not found")
+    
+    # Check the hang circuit breaker
+    breaker = breaker_status()
+    if breaker["state"] == "open":
+        lines.append(f"⛔ CLI circuit breaker open after {breaker['consecutive_hangs']} hangs, retry in {breaker['retry_in_seconds']:.0f}s")
+    elif breaker["state"] == "half_open":
+        lines.append("⚠️  CLI circuit breaker half-open, the next CLI run is a trial")
+    elif breaker["consecutive_hangs"]:
+        lines.append(f"⚠️  CLI hung {breaker['consecutive_hangs']} time(s) in a row")
+    else:
+        lines.append("✅ CLI circuit breaker closed")
+    
+    # Check wallet
+    try:
+        wallet_data = wallet_store.read_wallet(WALLET_JSON_PATH)
+        if wallet_data is None:
+            lines.append("❌ Wallet file not found")
+        else:
+            lines.append("✅ Wallet file found")
+            if wallet_store.has_keys(wallet_data):
+                lines.append("✅ Wallet contains valid keys")
+            else:
+                lines.append("⚠️  Wallet file exists but keys are missing")
+    except json.JSONDecodeError:
+        lines.append("✅ Wallet file found")
+        lines.append("❌ Wallet file is corrupted")
+    
+    return lines
+
+
+def metrics_report(output_format: str) -> str:
+    """Render the recorded timing histograms as Prometheus text or JSON percentiles"""
+    state = metrics_store.load(METRICS_STATE_PATH)
+    if output_format == "json":
+        return json.dumps(metrics_store.summary(state), indent=2)
+    return metrics_store.render_prometheus(state)
+
+
+def split_option(options: list[str]) -> list[str]:
+    """Turn ["--name=value"] into ["--name", "value"] for the hand-rolled fast-path parsing"""
+    if len(options) == 1 and options[0].startswith("--") and "=" in options[0]:
+        return options[0].split("=", 1)
+    return options
+
+
+def fast_main(argv: list[str]) -> Optional[int]:
+    """Answer basic-status, status, license-status and metrics without importing typer.
+    
+    Returns the exit code, or None when the full Typer app has to handle argv
+    (other commands, --help, or a license-status that must block on the CLI).
+    """
+    started = time.perf_counter()
+    if argv == ["basic-status"]:
+        print(json.dumps(basic_status_data(), indent=2))
+        metrics_store.observe("operation", "basic-status", time.perf_counter() - started)
+        return 0
+    if argv == ["status"]:
+        print("\n".join(status_report()))
+        metrics_store.observe("operation", "status", time.perf_counter() - started)
+        return 0
+    if argv[:1] == ["metrics"]:
+        options = split_option(argv[1:])
+        if not options:
+            options = ["--format", "prometheus"]
+        if len(options) != 2 or options[0] != "--format" or options[1] not in ("prometheus", "json"):
+            return None
+        sys.stdout.write(metrics_report(options[1]).rstrip("\n") + "\n")
+        return 0
+    if argv[:1] == ["license-status"]:
+        options = split_option(argv[1:])
+        if options and (len(options) != 2 or options[0] != "--ttl"):
+            return None
+        try:
+            ttl = float(options[1]) if options else LICENSE_CACHE_TTL
+        except ValueError:
+            return None
+        license_data = cached_license_status(ttl)
+        if license_data is None:
+            return None
+        print(json.dumps(license_data, indent=2))
+        metrics_store.observe("operation", "license-status", time.perf_counter() - started)
+        return 0
+    return None
+
+
+if __name__ == "__main__":
+    metrics_store.enable(METRICS_STATE_PATH)
+    exit_code = fast_main(sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+
+# Everything below is only needed once the fast-start path has declined argv
+import asyncio
+import contextlib
+import fcntl
+import subprocess
+from typing import Optional, Dict, Any, Callable, List
+
+import typer
+
+from output_capture import OutputCapture
 
 app = typer.Typer(help="Aethir CLI Automation Tool")
 
-# Configuration
-AETHIR_CLI_PATH = "/root/AethirCheckerCLI-linux/AethirCheckerCLI"
-WALLET_JSON_PATH = "/root/wallet.json"
-INSTALL_SCRIPT_PATH = "/root/AethirCheckerCLI-linux/install.sh"
+# Logging: AETHIR_LOG_LEVEL=debug|info|warning|error, AETHIR_LOG_FORMAT=text|json
+LOG_LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+LOG_LEVEL = os.environ.get("AETHIR_LOG_LEVEL", "info").lower()
+LOG_FORMAT = os.environ.get("AETHIR_LOG_FORMAT", "text").lower()
 
-class AethirCLI:
-    """Wrapper class for Aethir CLI interactions"""
+
+class SessionLog:
+    """Leveled stderr logger with per-source rate limiting and a debug ring.
     
-    def __init__(self, cli_path: str = AETHIR_CLI_PATH):
+    Below the configured level, debug records are appended unformatted to a
+    bounded ring instead of being written, so hot paths such as the CLI reader
+    cost one deque append. flush_ring() replays the ring when something fails.
+    Key-shaped tokens are redacted from everything that is written.
+    """
+    
+    def __init__(self, level: str = "info", fmt: str = "text", ring_size: int = 500,
+                 burst: int = 20, per_second: float = 5.0):
+        from collections import deque
+        
+        self.threshold = LOG_LEVELS.get(level, LOG_LEVELS["info"])
+        self.json_format = fmt == "json"
+        self.debug_enabled = self.threshold <= LOG_LEVELS["debug"]
+        self.ring = deque(maxlen=ring_size)
+        self.burst = burst
+        self.per_second = per_second
+        # source -> [tokens, last refill time, suppressed count]
+        self._buckets = {}
+    
+    def _allow(self, source: str, now: float) -> Optional[int]:
+        """Token bucket per source; returns the suppressed count to report, or None to drop"""
+        bucket = self._buckets.get(source)
+        if bucket is None:
+            bucket = self._buckets[source] = [float(self.burst), now, 0]
+        bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.per_second)
+        bucket[1] = now
+        if bucket[0] < 1:
+            bucket[2] += 1
+            return None
+        bucket[0] -= 1
+        suppressed, bucket[2] = bucket[2], 0
+        return suppressed
+    
+    def _write(self, level: str, source: str, message: Any, timestamp: float, fields: Dict[str, Any]) -> None:
+        suppressed = self._allow(source, time.monotonic())
+        if suppressed is None:
+            return
+        text = redact_secrets(message if isinstance(message, str) else repr(message))
+        if suppressed:
+            fields = dict(fields, suppressed=suppressed)
+        if self.json_format:
+            record = {"ts": round(timestamp, 3), "level": level, "source": source, "message": text}
+            record.update(fields)
+            line = json.dumps(record)
+        else:
+            extra = "".join(f" {key}={value}" for key, value in fields.items())
+            line = f"[{level}] {source}: {text}{extra}"
+        sys.stderr.write(line + "\n")
+        sys.stderr.flush()
+    
+    def log(self, level: str, source: str, message: Any, **fields) -> None:
+        if LOG_LEVELS[level] >= self.threshold:
+            self._write(level, source, message, time.time(), fields)
+    
+    def debug(self, source: str, message: Any, **fields) -> None:
+        if self.debug_enabled:
+            self._write("debug", source, message, time.time(), fields)
+        else:
+            self.ring.append((time.time(), source, message, fields))
+    
+    def info(self, source: str, message: Any, **fields) -> None:
+        self.log("info", source, message, **fields)
+    
+    def warning(self, source: str, message: Any, **fields) -> None:
+        self.log("warning", source, message, **fields)
+    
+    def error(self, source: str, message: Any, **fields) -> None:
+        self.log("error", source, message, **fields)
+    
+    def flush_ring(self, reason: str) -> None:
+        """Write out the buffered debug records after a failure"""
+        if not self.ring:
+            return
+        records = list(self.ring)
+        self.ring.clear()
+        self._write("error", "log", f"{reason}: replaying {len(records)} debug records", time.time(), {})
+        for timestamp, source, message, fields in records:
+            # Replayed records bypass the rate limiter, they are the failure context
+            self._buckets.pop(source, None)
+            self._write("debug", source, message, timestamp, fields)
+
+
+def redact_secrets(text: str) -> str:
+    """Mask base64 private keys and 40-hex public keys, keeping a short prefix"""
+    import re
+    
+    return re.sub(r"[A-Za-z0-9+/=]{50,}|\b[0-9a-f]{40}\b", lambda m: m.group(0)[:6] + "…[redacted]", text)
+
+
+log = SessionLog(LOG_LEVEL, LOG_FORMAT)
+
+class InstancePaths:
+    """File locations of one checker instance installed under a root directory"""
+    
+    def __init__(self, root: str, cli_path: Optional[str] = None, install_script_path: Optional[str] = None,
+                 wallet_path: Optional[str] = None):
+        self.root = root
+        self.cli_dir = os.path.join(root, "AethirCheckerCLI-linux")
+        self.cli_path = cli_path or os.path.join(self.cli_dir, "AethirCheckerCLI")
+        self.install_script_path = install_script_path or os.path.join(self.cli_dir, "install.sh")
+        self.wallet_path = wallet_path or os.path.join(root, "wallet.json")
+        # Kept in the root, not the CLI package: the package is copied as the seed of new instances
+        self.install_stamp_path = os.path.join(root, ".install-stamp.json")
+    
+    @classmethod
+    def default(cls) -> "InstancePaths":
+        """The single instance described by the module configuration"""
+        return cls(
+            os.path.dirname(WALLET_JSON_PATH),
+            cli_path=AETHIR_CLI_PATH,
+            install_script_path=INSTALL_SCRIPT_PATH,
+            wallet_path=WALLET_JSON_PATH
+        )
+
+# Prompt the checker CLI prints when it is ready for the next command
+CLI_PROMPT = "Aethir>"
+# How sessions talk to the CLI: "pipe" or "pty". Behind a pseudo-terminal the CLI
+# sees a TTY and flushes every write instead of block-buffering its output
+CLI_TRANSPORTS = ("pipe", "pty")
+CLI_TRANSPORT = os.environ.get("AETHIR_CLI_TRANSPORT", "pipe")
+# Session output kept in memory per session (older output spills to a temp file),
+# and the most unconsumed output an expect wait keeps while looking for its marker
+CLI_CAPTURE_SIZE = 256 * 1024
+CLI_STDERR_CAPTURE_SIZE = 64 * 1024
+CLI_PENDING_LIMIT = 1024 * 1024
+# CSI (colors, cursor movement), OSC (window titles) and two-byte escape sequences
+ANSI_ESCAPE_PATTERN = r"\x1b(?:\[[0-?]*[ -/]*[@-~]|\][^\x07\x1b]*(?:\x07|\x1b\\)|[@-Z\\-_])"
+
+# What each command has to produce before the next one may be sent:
+# (command substring, markers expected in order, step timeout in seconds).
+# A marker list of None means "wait for the CLI to exit".
+SESSION_STEPS = [
+    ("aethir exit", None, 15),
+    ("wallet create", ["Current public key:", CLI_PROMPT], 60),
+    ("wallet export", [CLI_PROMPT], 30),
+]
+# Read-only commands concurrent callers may share one CLI run for. Never wallet
+# commands: their output holds the private key and would land in CLI_FLIGHT_DIR
+SHARED_CLI_COMMANDS = {"aethir version", "aethir license summary"}
+# TOS acceptance covers "Client is starting up...", "Initializing..." and the first prompt
+TOS_STEP = ("y", [CLI_PROMPT], 90)
+DEFAULT_STEP_TIMEOUT = 30
+
+# Session that creates a wallet and prints its keys
+WALLET_COMMANDS = [
+    "y",  # Accept TOS
+    "aethir wallet create",  # Create wallet
+    "aethir wallet export",  # Export keys
+    "aethir exit"  # Properly exit the CLI
+]
+
+
+def step_phase(command: str) -> str:
+    """Metrics phase name for a session step: 'y' is TOS acceptance plus initialization"""
+    if command == TOS_STEP[0]:
+        return "tos_init"
+    return command.replace("aethir ", "", 1).replace(" ", "_")
+
+
+def session_step(command: str) -> tuple:
+    """Return the (command, markers, timeout) step spec used for a command"""
+    if command == TOS_STEP[0]:
+        return TOS_STEP
+    for match, markers, timeout in SESSION_STEPS:
+        if match in command:
+            return (match, markers, timeout)
+    return (command, [CLI_PROMPT], DEFAULT_STEP_TIMEOUT)
+
+
+def cli_workdir(cli_path: str) -> str:
+    """Directory to run the CLI in: its install directory, where it keeps its files"""
+    return os.path.dirname(os.path.abspath(cli_path))
+
+
+class AnsiStripper:
+    """Removes ANSI escape sequences from a stream of output chunks.
+    
+    A sequence cut in half by a chunk boundary is held back until the rest
+    of it arrives, so neither half leaks into the text the parsers see.
+    """
+    
+    def __init__(self):
+        import re
+        
+        self._pattern = re.compile(ANSI_ESCAPE_PATTERN)
+        self._carry = ""
+    
+    def feed(self, text: str) -> str:
+        if self._carry:
+            text, self._carry = self._carry + text, ""
+        if "\x1b" not in text:
+            return text
+        escape = text.rfind("\x1b")
+        if not self._pattern.match(text, escape) and len(text) - escape < 256:
+            text, self._carry = text[:escape], text[escape:]
+        return self._pattern.sub("", text)
+    
+    def close(self) -> str:
+        """Return whatever was held back once no more output will arrive"""
+        text, self._carry = self._carry, ""
+        return text
+
+
+class CLICircuitOpen(RuntimeError):
+    """Raised instead of spawning the CLI while the hang circuit breaker is open"""
+
+
+def record_cli_outcome(hung: bool) -> Dict[str, Any]:
+    """Update the persisted circuit breaker after a CLI session ended.
+    
+    A hang counts towards the threshold and (re)opens the breaker for the
+    cool-down once it is reached; a session that finished cleanly closes it.
+    Clean sessions only write when there is something to reset.
+    """
+    if not hung and read_breaker_state().get("consecutive_hangs", 0) == 0:
+        return breaker_status()
+    os.makedirs(os.path.dirname(CLI_BREAKER_PATH), exist_ok=True)
+    fd = os.open(f"{CLI_BREAKER_PATH}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        state = read_breaker_state()
+        if hung:
+            state["consecutive_hangs"] = state.get("consecutive_hangs", 0) + 1
+            state["last_hang"] = time.time()
+            if state["consecutive_hangs"] >= BREAKER_THRESHOLD:
+                state["open_until"] = time.time() + BREAKER_COOLDOWN
+                state["trips"] = state.get("trips", 0) + 1
+                log.error("cli.breaker", f"CLI hung {state['consecutive_hangs']} times in a row, "
+                                         f"not spawning it for {BREAKER_COOLDOWN:g}s")
+        else:
+            state.update({"consecutive_hangs": 0, "open_until": None})
+        json_files.atomic_write_json(CLI_BREAKER_PATH, state)
+    finally:
+        os.close(fd)
+    return breaker_status(state)
+
+
+def single_flight(key: str, compute: Callable[[], Any]) -> tuple:
+    """Run compute() once for all concurrent callers of key, across processes; returns (result, shared).
+    
+    Outcomes are shared through a JSON file, and a waiter only reuses one,
+    failure included, that finished after it started waiting.
+    """
+    os.makedirs(CLI_FLIGHT_DIR, exist_ok=True)
+    result_path = os.path.join(CLI_FLIGHT_DIR, f"{key}.json")
+    fd = os.open(os.path.join(CLI_FLIGHT_DIR, f"{key}.lock"), os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            waiting_since = time.time()
+            with metrics_store.span("phase", "single_flight_wait"):
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                with open(result_path, 'r') as f:
+                    outcome = json.load(f)
+            except (OSError, ValueError):
+                outcome = {}
+            if outcome.get("finished_at", 0) >= waiting_since:
+                if "error" in outcome:
+                    raise RuntimeError(outcome["error"])
+                return outcome["result"], True
+        
+        outcome = {}
+        try:
+            outcome["result"] = compute()
+            return outcome["result"], False
+        except Exception as e:
+            outcome["error"] = str(e) or type(e).__name__
+            raise
+        finally:
+            outcome["finished_at"] = time.time()
+            json_files.atomic_write_json(result_path, outcome)
+    finally:
+        os.close(fd)
+
+
+def flight_key(cli_path: str, commands: list[str]) -> str:
+    """single_flight key for a CLI query made of these commands, per CLI binary"""
+    import hashlib
+    
+    query = "\n".join([os.path.realpath(cli_path)] + commands)
+    return "query-" + hashlib.sha1(query.encode()).hexdigest()[:16]
+
+
+class AsyncCheckerSession:
+    """One supervised checker CLI process driven with async send/expect from an event loop.
+    
+    close() must run afterwards, even after a cancel; the context manager and
+    the run_* helpers see to that.
+    """
+    
+    def __init__(self, cli_path: str = AETHIR_CLI_PATH, transport: str = CLI_TRANSPORT, spill: bool = True):
+        if transport not in CLI_TRANSPORTS:
+            raise ValueError(f"unknown CLI transport '{transport}', use {' or '.join(CLI_TRANSPORTS)}")
         self.cli_path = cli_path
+        self.transport = transport
+        self.spill = spill
         self.process = None
+        self.parser = None
+        self.capture = OutputCapture(CLI_CAPTURE_SIZE, spill=spill)
+        self.stderr = OutputCapture(CLI_STDERR_CAPTURE_SIZE, spill=False)
+        self.before = ""
+        self.eof = False
+        self._pending = ""
+        self._pending_trimmed = 0
+        self._changed = None
+        self._tasks = []
+        self._spawned_at = None
+        self.parse_seconds = 0.0
+        self.hung = False
+        self.hang_reason = None
+        self.step_failed = False
+        self.last_activity = 0.0
+        self._sent_at = 0.0
+        self._stdout = None
+        self._pty_fd = None
+        self._pty_transport = None
+        self._input_closed = False
+        self._capture_handed_over = False
+    
+    async def __aenter__(self) -> "AsyncCheckerSession":
+        await self.start()
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+    
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+    
+    async def start(self) -> None:
+        """Spawn the CLI and start the stdout/stderr reader tasks.
         
-    def run_command(self, command: str, timeout: int = 60) -> subprocess.CompletedProcess:
-        """Run a single Aethir CLI command"""
+        Set self.parser before sending commands to have the reader feed it
+        every chunk as it arrives. Raises CLICircuitOpen while the breaker is open.
+        """
+        breaker = breaker_status()
+        if breaker["state"] == "open":
+            raise CLICircuitOpen(f"CLI circuit breaker open after {breaker['consecutive_hangs']} hangs, "
+                                 f"retry in {breaker['retry_in_seconds']:.0f}s")
+        with metrics_store.span("phase", "spawn"):
+            if self.transport == "pty":
+                await self._spawn_pty()
+            else:
+                self.process = await asyncio.create_subprocess_exec(
+                    self.cli_path,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    cwd=cli_workdir(self.cli_path),
+                    start_new_session=True
+                )
+                self._stdout = self.process.stdout
+        self._input_closed = False
+        self._spawned_at = time.perf_counter()
+        self.last_activity = asyncio.get_running_loop().time()
+        self.hung = False
+        self.hang_reason = None
+        self.step_failed = False
+        self.parse_seconds = 0.0
+        self._close_captures()
+        self._capture_handed_over = False
+        self.capture = OutputCapture(CLI_CAPTURE_SIZE, spill=self.spill)
+        self.stderr = OutputCapture(CLI_STDERR_CAPTURE_SIZE, spill=False)
+        self.before = ""
+        self.eof = False
+        self._pending = ""
+        self._pending_trimmed = 0
+        self._changed = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._read_stdout()),
+            asyncio.create_task(self._read_stderr())
+        ]
+    
+    async def _spawn_pty(self) -> None:
+        """Spawn the CLI with stdin and stdout on a pseudo-terminal"""
+        import pty
+        import termios
+        
+        master, slave = pty.openpty()
+        attrs = termios.tcgetattr(slave)
+        attrs[1] &= ~termios.OPOST  # keep "\n" as is instead of "\r\n"
+        attrs[3] &= ~termios.ECHO  # don't read our own commands back
+        termios.tcsetattr(slave, termios.TCSANOW, attrs)
         try:
-            # Use subprocess.run with input for interactive commands
-            result = subprocess.run(
-                [self.cli_path],
-                input=command,
-                text=True,
-                capture_output=True,
-                timeout=timeout
+            self.process = await asyncio.create_subprocess_exec(
+                self.cli_path,
+                stdin=slave,
+                stdout=slave,
+                stderr=subprocess.PIPE,
+                cwd=cli_workdir(self.cli_path),
+                start_new_session=True
             )
-            return result
-        except subprocess.TimeoutExpired:
-            typer.echo(f"❌ Command timed out after {timeout} seconds", err=True)
+        except BaseException:
+            os.close(master)
             raise
+        finally:
+            os.close(slave)
+        self._pty_fd = master
+        self._stdout = asyncio.StreamReader()
+        self._pty_transport, _ = await asyncio.get_running_loop().connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(self._stdout), os.fdopen(os.dup(master), 'rb', buffering=0)
+        )
+    
+    async def _read_stdout(self) -> None:
+        """Read stdout in chunks so prompts without a trailing newline are seen immediately"""
+        import codecs
+        import errno
+        
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        stripper = AnsiStripper()
+        try:
+            while True:
+                data = await self._stdout.read(4096)
+                if not data:
+                    break
+                self.last_activity = asyncio.get_running_loop().time()
+                text = stripper.feed(decoder.decode(data))
+                if not text:
+                    continue
+                if not self.capture.total_chars:
+                    # Spawn until the first output, normally the TOS prompt
+                    metrics_store.observe("phase", "startup", time.perf_counter() - self._spawned_at)
+                self.capture.write(text)
+                self._append_pending(text)
+                if self.parser is not None:
+                    parse_started = time.perf_counter()
+                    self.parser.feed(text)
+                    self.parse_seconds += time.perf_counter() - parse_started
+                log.debug("cli.stdout", text)
+                self._changed.set()
+        except OSError as e:
+            # A pty master reports EIO once the CLI side is gone, that is its end of file
+            if e.errno != errno.EIO:
+                log.error("cli.reader", f"read error: {e}")
         except Exception as e:
-            typer.echo(f"❌ Error running command: {e}", err=True)
-            raise
+            log.error("cli.reader", f"read error: {e}")
+        finally:
+            tail = stripper.close()
+            if tail:
+                self.capture.write(tail)
+                self._append_pending(tail)
+                if self.parser is not None:
+                    self.parser.feed(tail)
+            self.eof = True
+            if self.parser is not None:
+                self.parser.close()
+            self._changed.set()
+    
+    async def _read_stderr(self) -> None:
+        """Drain stderr so a chatty CLI can never block on a full pipe"""
+        while True:
+            data = await self.process.stderr.read(4096)
+            if not data:
+                break
+            self.stderr.write(data.decode("utf-8", errors="replace"))
     
-    def interactive_session(self, commands: list[str]) -> Dict[str, str]:
-        """Run multiple commands in an interactive session with proper prompt waiting"""
-        import threading
-        import queue
+    def _append_pending(self, text: str) -> None:
+        """Add output to the expect window, dropping its oldest part past CLI_PENDING_LIMIT"""
+        self._pending += text
+        excess = len(self._pending) - CLI_PENDING_LIMIT
+        if excess > 0:
+            self._pending = self._pending[excess:]
+            self._pending_trimmed += excess
+    
+    async def send(self, command: str) -> None:
+        """Write one command line to the CLI"""
+        self._sent_at = self.last_activity = asyncio.get_running_loop().time()
+        if self._pty_fd is not None:
+            os.write(self._pty_fd, (command + "\n").encode())
+        else:
+            self.process.stdin.write((command + "\n").encode())
+            await self.process.stdin.drain()
+    
+    def close_input(self) -> None:
+        """Signal end of input: close stdin, or send the EOF character over a pty"""
+        if self._input_closed:
+            return
+        self._input_closed = True
+        if self._pty_fd is not None:
+            try:
+                os.write(self._pty_fd, b"\x04")
+            except OSError:
+                pass
+        elif not self.process.stdin.is_closing():
+            self.process.stdin.close()
+    
+    async def expect(self, marker: str, timeout: float) -> bool:
+        """Wait until marker appears in unconsumed output; False on timeout, stall or EOF.
         
+        No output since the last command when the timeout runs out, or for
+        CLI_INACTIVITY_TIMEOUT, marks the session hung.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        # Absolute offset into the output, so trimming the window doesn't skip text
+        search_from = 0
+        while True:
+            if self.parser is not None and self.parser.complete:
+                self.before = self._pending
+                self._pending = ""
+                return True
+            index = self._pending.find(marker, max(0, search_from - self._pending_trimmed))
+            if index != -1:
+                self.before = self._pending[:index]
+                self._pending = self._pending[index + len(marker):]
+                return True
+            if self.eof:
+                return False
+            # Only rescan the tail that could still hold a partial marker
+            search_from = self._pending_trimmed + max(0, len(self._pending) - len(marker) + 1)
+            remaining = deadline - loop.time()
+            idle_remaining = self.last_activity + CLI_INACTIVITY_TIMEOUT - loop.time()
+            if idle_remaining <= 0:
+                self._mark_hung(f"no output for {CLI_INACTIVITY_TIMEOUT:g}s")
+                return False
+            if remaining <= 0:
+                if self.last_activity <= self._sent_at:
+                    self._mark_hung(f"no output for {loop.time() - self._sent_at:.0f}s after the command")
+                return False
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), min(remaining, idle_remaining))
+            except asyncio.TimeoutError:
+                pass
+    
+    def _mark_hung(self, reason: str) -> None:
+        if not self.hung:
+            pid = self.process.pid if self.process is not None else None
+            log.warning("cli.watchdog", f"pid {pid} looks hung: {reason}")
+            self.hang_reason = reason
+        self.hung = True
+    
+    async def wait_exit(self, timeout: float) -> bool:
+        """Wait for the CLI to exit and its output to be fully read"""
         try:
-            # Start the CLI process
-            self.process = subprocess.Popen(
-                [self.cli_path],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=0  # Unbuffered
-            )
-            
-            # Queue for collecting output
-            output_queue = queue.Queue()
-            all_output = []
-            
-            def read_output():
-                """Read stdout in a separate thread with full debugging"""
-                try:
-                    while True:
-                        line = self.process.stdout.readline()
-                        if not line:
-                            break
-                        all_output.append(line)
-                        output_queue.put(line)
-                        # Debug: Show every line from CLI in real-time
-                        typer.echo(f"🔍 CLI OUTPUT: {repr(line)}")
-                except Exception as e:
-                    typer.echo(f"🔍 READ ERROR: {e}")
-                    pass
-            
-            # Start reading thread
-            reader_thread = threading.Thread(target=read_output)
-            reader_thread.daemon = True
-            reader_thread.start()
-            
-            # Send commands with proper timing based on actual CLI flow
-            typer.echo("🚀 Starting interactive session...")
+            await asyncio.wait_for(self.process.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        await asyncio.wait(self._tasks, timeout=1)
+        return True
+    
+    async def run_step(self, command: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Send a command and wait until the CLI is ready for the next one"""
+        _, markers, step_timeout = session_step(command)
+        timeout = step_timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await self.send(command)
+        if markers is None:
+            self.close_input()
+            ready = await self.wait_exit(timeout)
+        else:
+            deadline = started + timeout
+            ready = True
+            for marker in markers:
+                if not await self.expect(marker, max(0, deadline - loop.time())):
+                    ready = False
+                    break
+        seconds = loop.time() - started
+        if not ready:
+            self.step_failed = True
+        metrics_store.observe("phase", step_phase(command), seconds, ready)
+        return {
+            "command": command,
+            "seconds": round(seconds, 3),
+            "ready": ready
+        }
+    
+    def _close_captures(self) -> None:
+        """Delete the spill files, except that of a capture the caller now owns"""
+        if not self._capture_handed_over:
+            self.capture.close()
+        self.stderr.close()
+    
+    def _signal_group(self, signum: int) -> None:
+        """Signal the CLI's whole process group, including any helpers it started"""
+        try:
+            os.killpg(self.process.pid, signum)
+        except (ProcessLookupError, PermissionError):
+            pass
+    
+    async def close(self) -> None:
+        """Stop the CLI's process group: SIGTERM, then SIGKILL after CLI_KILL_GRACE seconds.
+        
+        A hung session, or one that needs SIGKILL, counts as a hang for the
+        circuit breaker; one that got going and never missed a step counts as
+        healthy, anything else leaves the breaker as it is.
+        """
+        import signal
+        
+        if self.process is None:
+            return
+        if self.parser is not None and self.parse_seconds:
+            metrics_store.observe("phase", "parse", self.parse_seconds)
+            self.parse_seconds = 0.0
+        self.close_input()
+        if self.alive:
+            self._signal_group(signal.SIGTERM)
+            try:
+                await asyncio.wait_for(self.process.wait(), CLI_KILL_GRACE)
+            except asyncio.TimeoutError:
+                self._mark_hung(f"ignored SIGTERM for {CLI_KILL_GRACE}s")
+                self._signal_group(signal.SIGKILL)
+                await self.process.wait()
+        # Helpers left behind in the group would keep the pipes open
+        self._signal_group(signal.SIGKILL)
+        # Let the readers drain what is left before the pipes are torn down
+        done, pending = await asyncio.wait(self._tasks, timeout=1) if self._tasks else ((), ())
+        for task in pending:
+            task.cancel()
+        self._tasks = []
+        if self._pty_fd is not None:
+            self._pty_transport.close()
+            os.close(self._pty_fd)
+            self._pty_fd = None
+            self._pty_transport = None
+        self._close_captures()
+        if self.hung or (self.capture.total_chars and not self.step_failed):
+            record_cli_outcome(self.hung)
+    
+    async def run_command(self, command: str, timeout: float = DEFAULT_STEP_TIMEOUT,
+                          parser: Optional[LineParser] = None) -> str:
+        """Run one command in a fresh session (TOS, command, exit) and return its output.
+        
+        Raises asyncio.TimeoutError when the CLI never becomes ready.
+        """
+        try:
+            await self.start()
+            if not (await self.run_step(TOS_STEP[0]))["ready"]:
+                raise asyncio.TimeoutError(f"CLI not ready: {self.hang_reason or f'no prompt after {TOS_STEP[2]}s'}")
+            self.parser = parser
+            if not (await self.run_step(command, timeout=timeout))["ready"]:
+                raise asyncio.TimeoutError(f"'{command}' not ready: {self.hang_reason or f'no prompt after {timeout}s'}")
+            output = self.before.strip()
+            await self.run_step("aethir exit")
+            return output
+        finally:
+            await self.close()
+    
+    async def run_commands(self, commands: list[str], parser: Optional[LineParser] = None,
+                           progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """Run multiple commands in one session, waiting on prompts instead of fixed sleeps.
+        
+        With a parser, the remaining commands are skipped as soon as it is
+        complete and the session goes straight to its exit command. The
+        returned capture belongs to the caller, who closes it when done.
+        """
+        echo = progress or (lambda message: None)
+        try:
+            await self.start()
+            self.parser = parser
+            echo("🚀 Starting interactive session...")
             
+            steps = []
             for i, command in enumerate(commands):
-                typer.echo(f"📤 Sending command {i+1}: {command}")
-                self.process.stdin.write(command + "\n")
-                self.process.stdin.flush()
-                
-                if command == "y":
-                    # Wait for TOS acceptance, "Client is starting up...", "Initializing...", and instructions
-                    typer.echo("⏳ Waiting for TOS acceptance, CLI startup, initialization, and Aethir> prompt...")
-                    time.sleep(10)  # Need more time for full initialization
-                    
-                elif "wallet create" in command:
-                    # Wait for wallet creation, keys display, and next Aethir> prompt
-                    typer.echo("⏳ Waiting for wallet creation and keys display...")
-                    time.sleep(5)
-                    
-                elif "wallet export" in command:
-                    # Wait for export completion and keys display
-                    typer.echo("⏳ Waiting for wallet export completion...")
-                    time.sleep(3)
-                    
-                elif "aethir exit" in command:
-                    # Wait for CLI to exit properly
-                    typer.echo("⏳ Waiting for CLI to exit...")
-                    time.sleep(2)
-            
-            # Close stdin after sending all commands
-            self.process.stdin.close()
-            
-            # Wait for process to complete (since we sent aethir exit)
-            typer.echo("⏳ Waiting for CLI to exit completely...")
-            try:
-                self.process.wait(timeout=10)
-                typer.echo("✅ CLI exited successfully")
-            except subprocess.TimeoutExpired:
-                typer.echo("⚠️ CLI didn't exit in time, but that's OK")
-                time.sleep(2)  # Give a moment for final output
+                if parser is not None and parser.complete and session_step(command)[1] is not None:
+                    echo(f"⏭️  Output already complete, skipping: {command}")
+                    continue
+                echo(f"📤 Sending command {i+1}: {command}")
+                step = await self.run_step(command)
+                steps.append(step)
+                if step["ready"]:
+                    echo(f"⏱️  '{command}' ready after {step['seconds']:.2f}s")
+                else:
+                    echo(f"⚠️ '{command}' not ready after {step['seconds']:.2f}s, continuing")
+                if self.eof and i < len(commands) - 1:
+                    echo("⚠️ CLI closed its output early, stopping session")
+                    break
             
-            # Join the reader thread
-            typer.echo("⏳ Joining reader thread...")
-            reader_thread.join(timeout=5)
+            # Make sure the CLI is gone before collecting the remaining output
+            if self.alive:
+                self.close_input()
+                if not await self.wait_exit(5):
+                    echo("⚠️ CLI didn't exit in time, but that's OK")
             
-            # Get stderr
-            stderr = self.process.stderr.read()
+            stderr = self.stderr.text() if self.stderr.total_chars else ""
             if stderr:
-                typer.echo(f"🔍 STDERR: {repr(stderr)}")
-            
-            stdout_text = "".join(all_output)
-            typer.echo(f"🔍 Total stdout length: {len(stdout_text)}")
-            typer.echo(f"🔍 Total lines captured: {len(all_output)}")
+                log.debug("cli.stderr", stderr)
             
-            # Since we're letting the process continue running, return success
-            typer.echo(f"✅ Interaction completed successfully (CLI still running)")
+            log.debug("cli.session", "session finished", pid=self.process.pid, **self.capture.stats())
+            echo(f"✅ Interaction completed in {sum(step['seconds'] for step in steps):.2f}s")
             
+            self._capture_handed_over = True
             return {
-                "stdout": stdout_text,
+                "capture": self.capture,
                 "stderr": stderr,
-                "returncode": 0  # Success since we got the keys
+                "returncode": 0,  # Success is decided by parsing the keys
+                "steps": steps,
+                "parsed": parser.result() if parser is not None else None
             }
+        finally:
+            await self.close()
+    
+    async def run_batch(self, commands: list[str], timeout: float = DEFAULT_STEP_TIMEOUT) -> Dict[str, Any]:
+        """Run commands in one session and split the output into per-command sections.
+        
+        Each section is the text the CLI printed between the command and the
+        next prompt. No session parser is set, so every step waits for the real
+        prompt and a section can never leak into the next one. The batch stops
+        at the first command that doesn't get its prompt back.
+        """
+        try:
+            await self.start()
+            init = await self.run_step(TOS_STEP[0])
+            if not init["ready"]:
+                reason = self.hang_reason or f"no prompt after {init['seconds']:.2f}s"
+                raise asyncio.TimeoutError(f"CLI not ready: {reason}")
+            sections = []
+            for command in commands:
+                step = await self.run_step(command, timeout=timeout)
+                sections.append({
+                    "command": command,
+                    "ok": step["ready"],
+                    "seconds": step["seconds"],
+                    "output": (self.before if step["ready"] else self._pending).strip()
+                })
+                if not step["ready"]:
+                    break
+            if sections and sections[-1]["ok"]:
+                await self.run_step("aethir exit")
+            return {"startup_seconds": init["seconds"], "sections": sections}
+        finally:
+            await self.close()
+
+
+async def run_sessions(jobs: list[Dict[str, Any]], timeout: float) -> list[Dict[str, Any]]:
+    """Drive several independent checker sessions concurrently from one event loop.
+    
+    Each job is {"cli_path", "command", "parser" (optional), "transport"
+    (optional)}. A job that runs
+    past its timeout is cancelled and its CLI killed without affecting the rest.
+    """
+    loop = asyncio.get_running_loop()
+    
+    async def run_one(job: Dict[str, Any]) -> Dict[str, Any]:
+        session = AsyncCheckerSession(job["cli_path"], job.get("transport", CLI_TRANSPORT))
+        started = loop.time()
+        result = {"cli_path": job["cli_path"], "command": job["command"]}
+        task = asyncio.ensure_future(session.run_command(job["command"], parser=job.get("parser")))
+        try:
+            done, _ = await asyncio.wait([task], timeout=timeout)
+            if not done:
+                # Mark it before cancelling, so the session's own close() records the hang
+                session._mark_hung(f"no result within {timeout}s")
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+                raise asyncio.TimeoutError(f"timed out after {timeout}s")
+            result.update({"ok": True, "output": task.result()})
+        except asyncio.TimeoutError as e:
+            result.update({"ok": False, "error": str(e) or f"timed out after {timeout}s"})
+        except Exception as e:
+            result.update({"ok": False, "error": str(e)})
+        if not result["ok"]:
+            log.flush_ring(f"{job['cli_path']}: {result['error']}")
+        result["seconds"] = round(loop.time() - started, 3)
+        return result
+    
+    return list(await asyncio.gather(*(run_one(job) for job in jobs)))
+
+
+class AethirCLI:
+    """Synchronous wrapper around AsyncCheckerSession for the Typer commands.
+    
+    verbose echoes per-step progress; raw CLI output is only logged at debug level.
+    transport ("pipe" or "pty") applies to the sessions this wrapper starts.
+    """
+    
+    def __init__(self, cli_path: str = AETHIR_CLI_PATH, verbose: bool = True, transport: str = CLI_TRANSPORT):
+        self.cli_path = cli_path
+        self.verbose = verbose
+        self.transport = transport
+        self.session = None
+    
+    @property
+    def process(self):
+        """The asyncio process of the last session (pid, returncode)"""
+        return self.session.process if self.session else None
+    
+    @property
+    def uses_daemon(self) -> bool:
+        """The session daemon only serves the default CLI install"""
+        return os.path.realpath(self.cli_path) == os.path.realpath(AETHIR_CLI_PATH)
+    
+    def run_command(self, command: str, timeout: int = 60, parser: Optional[LineParser] = None) -> subprocess.CompletedProcess:
+        """Run a single Aethir CLI command, through the session daemon when it is running.
+        
+        With a parser, the command counts as done as soon as the parser is
+        complete. Without the daemon, concurrent callers of a command in
+        SHARED_CLI_COMMANDS share one CLI run instead of each starting one.
+        """
+        if self.uses_daemon:
+            with metrics_store.span("operation", "run_command_daemon") as timing:
+                response = query_checker_daemon(command, timeout=timeout)
+                timing.ok = response is not None and response.get("ok")
+                if timing.ok:
+                    if parser:
+                        parser.feed(response["output"])
+                        parser.close()
+                    return subprocess.CompletedProcess([self.cli_path], 0, stdout=response["output"], stderr="")
+                # Only record the daemon round trip when it answered
+                timing.label = "run_command_daemon_miss"
+        
+        if command in SHARED_CLI_COMMANDS:
+            output, shared = single_flight(flight_key(self.cli_path, [command]), lambda: self._session_command(command, timeout, parser))
+            if shared and parser:
+                parser.feed(output)
+                parser.close()
+            return subprocess.CompletedProcess([self.cli_path], 0, stdout=output, stderr="")
+        output = self._session_command(command, timeout, parser)
+        return subprocess.CompletedProcess([self.cli_path], 0, stdout=output, stderr=self.session.stderr.text())
+    
+    def _session_command(self, command: str, timeout: int, parser: Optional[LineParser]) -> str:
+        """Run the command in a fresh CLI session and return its output"""
+        self.session = AsyncCheckerSession(self.cli_path, self.transport)
+        started = time.monotonic()
+        try:
+            with metrics_store.span("operation", "run_command"):
+                return asyncio.run(self.session.run_command(command, timeout, parser))
+        except asyncio.TimeoutError as e:
+            # A watchdog trip ends the wait long before the step timeout, report what really elapsed
+            elapsed = round(time.monotonic() - started, 2)
+            log.error("cli.command", f"'{command}' gave up after {elapsed:g} seconds: {e}")
+            log.flush_ring("command timed out")
+            raise subprocess.TimeoutExpired([self.cli_path], elapsed)
+        except Exception as e:
+            log.error("cli.command", f"error running '{command}': {e}")
+            log.flush_ring("command failed")
+            raise
+    
+    def batch(self, commands: list[str], timeout: float = DEFAULT_STEP_TIMEOUT) -> Dict[str, Any]:
+        """Run several commands in one session and parse each command's section of the output.
+        
+        Goes through the session daemon when it is running and this is the
+        default CLI, so there is no startup at all; otherwise one CLI is started for the whole batch, and
+        shared with concurrent callers when every command is in SHARED_CLI_COMMANDS.
+        Commands listed in COMMAND_PARSERS get their section parsed into
+        "parsed"; a command that never got its prompt back is reported with
+        ok False along with everything after it.
+        """
+        started = time.monotonic()
+        with metrics_store.span("operation", "batch") as timing:
+            sections = []
+            for command in (commands if self.uses_daemon else []):
+                response = query_checker_daemon(command, timeout=timeout)
+                if response is None:
+                    break
+                sections.append({
+                    "command": command,
+                    "ok": bool(response.get("ok")),
+                    "seconds": response.get("seconds"),
+                    "output": response.get("output", "").strip()
+                })
+                if not response.get("ok"):
+                    sections[-1]["error"] = response.get("error")
+            if len(sections) == len(commands):
+                result = {"via": "daemon", "startup_seconds": 0.0, "sections": sections}
+            else:
+                # No daemon for this CLI (or it went away mid-batch): one session for everything
+                if all(command in SHARED_CLI_COMMANDS for command in commands):
+                    result, shared = single_flight(flight_key(self.cli_path, commands), lambda: self._session_batch(commands, timeout))
+                    result["via"] = "shared_session" if shared else "session"
+                else:
+                    result = self._session_batch(commands, timeout)
+                    result["via"] = "session"
             
-        except subprocess.TimeoutExpired:
-            typer.echo("⚠️ Process timed out, terminating...")
-            self.process.kill()
-            return {
-                "stdout": "".join(all_output),
-                "stderr": "Process timed out",
-                "returncode": -1
-            }
+            done = {section["command"] for section in result["sections"]}
+            for command in commands:
+                if command not in done:
+                    result["sections"].append({"command": command, "ok": False, "seconds": None, "output": "",
+                                               "error": result.get("error", "not run, an earlier command did not finish")})
+            for section in result["sections"]:
+                parser_class = COMMAND_PARSERS.get(section["command"])
+                if parser_class is not None and section["ok"]:
+                    parser = parser_class()
+                    parser.feed(section["output"])
+                    parser.close()
+                    section["parsed"] = parser.result()
+            result["ok"] = all(section["ok"] for section in result["sections"])
+            timing.ok = result["ok"]
+        result["total_seconds"] = round(time.monotonic() - started, 3)
+        return result
+    
+    def _session_batch(self, commands: list[str], timeout: float) -> Dict[str, Any]:
+        """Run the batch in one fresh CLI session; a session that fails to start is reported, not raised"""
+        self.session = AsyncCheckerSession(self.cli_path, self.transport)
+        try:
+            return asyncio.run(self.session.run_batch(commands, timeout))
+        except Exception as e:
+            log.flush_ring("batch session failed")
+            return {"startup_seconds": None, "sections": [], "error": str(e)}
+    
+    def interactive_session(self, commands: list[str], parser: Optional[LineParser] = None) -> Dict[str, Any]:
+        """Run multiple commands in an interactive session, waiting on prompts instead of fixed sleeps"""
+        self.session = AsyncCheckerSession(self.cli_path, self.transport)
+        try:
+            progress = typer.echo if self.verbose else None
+            with metrics_store.span("operation", "interactive_session"):
+                return asyncio.run(self.session.run_commands(commands, parser, progress=progress))
         except Exception as e:
-            typer.echo(f"❌ Interactive session error: {e}", err=True)
+            log.error("cli.session", f"interactive session error: {e}")
+            log.flush_ring("interactive session failed")
             raise
-        finally:
-            if self.process and self.process.poll() is None:
-                self.process.terminate()
+
+
+class CheckerDaemon:
+    """Keeps one initialized CLI session alive and serializes commands onto it"""
+    
+    def __init__(self, cli_path: str = AETHIR_CLI_PATH):
+        self.cli_path = cli_path
+        self.session = None
+        self.started_at = None
+        self.restarts = 0
+        self.lock = asyncio.Lock()
+    
+    async def _ensure_session(self) -> AsyncCheckerSession:
+        """Return a ready session, (re)starting the CLI if it is not running"""
+        if self.session and self.session.alive and not self.session.eof:
+            return self.session
+        if self.session:
+            typer.echo("⚠️ CLI session died, restarting...")
+            await self.session.close()
+            self.session = None
+            self.restarts += 1
+        # The shared session runs for days, old output is dropped rather than spilled
+        session = AsyncCheckerSession(self.cli_path, spill=False)
+        await session.start()
+        step = await session.run_step(TOS_STEP[0])
+        if not step["ready"]:
+            await session.close()
+            raise RuntimeError(f"CLI not ready: {session.hang_reason or f'no prompt after {TOS_STEP[2]}s'}")
+        typer.echo(f"✅ CLI session ready after {step['seconds']:.2f}s (pid {session.process.pid})")
+        self.session = session
+        self.started_at = time.time()
+        return session
+    
+    async def execute(self, command: str, timeout: float = DEFAULT_STEP_TIMEOUT) -> Dict[str, Any]:
+        """Run one command on the shared session and return its output"""
+        if session_step(command)[1] is None:
+            return {"ok": False, "error": f"'{command}' would end the shared session"}
+        async with self.lock:
+            with metrics_store.span("operation", "daemon_command") as timing:
+                result = await self._execute(command, timeout)
+                timing.ok = result["ok"]
+            return result
+    
+    async def _execute(self, command: str, timeout: float) -> Dict[str, Any]:
+        started = time.monotonic()
+        try:
+            session = await self._ensure_session()
+            await session.send(command)
+            if not await session.expect(CLI_PROMPT, timeout):
+                # The session is in an unknown state, start over on the next request
+                log.flush_ring(f"no prompt after '{command}'")
+                await session.close()
+                self.session = None
+                return {"ok": False, "error": f"no prompt after {timeout}s", "seconds": round(time.monotonic() - started, 3)}
+            metrics_store.observe("phase", step_phase(command), time.monotonic() - started)
+            return {"ok": True, "output": session.before.strip(), "seconds": round(time.monotonic() - started, 3)}
+        except Exception as e:
+            return {"ok": False, "error": str(e), "seconds": round(time.monotonic() - started, 3)}
+    
+    def ping(self) -> Dict[str, Any]:
+        """Report whether the shared session is alive without touching the CLI"""
+        alive = bool(self.session and self.session.alive)
+        return {
+            "ok": True,
+            "session_alive": alive,
+            "pid": self.session.process.pid if alive else None,
+            "uptime": round(time.time() - self.started_at, 1) if alive else 0,
+            "restarts": self.restarts
+        }
+    
+    async def close(self) -> None:
+        async with self.lock:
+            if self.session:
+                await self.session.close()
+                self.session = None
+
+
+def query_checker_daemon(command: Optional[str] = None, timeout: float = DEFAULT_STEP_TIMEOUT,
+                         socket_path: str = CHECKER_SOCKET_PATH) -> Optional[Dict[str, Any]]:
+    """Send one request to the session daemon; None when the daemon is not running.
+    
+    Requests and responses are single JSON lines. Without a command this is a ping.
+    """
+    import socket
+    
+    if not os.path.exists(socket_path):
+        return None
+    request = {"op": "ping"} if command is None else {"op": "run", "command": command, "timeout": timeout}
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            # Leave room for a CLI restart on top of the command itself
+            sock.settimeout(timeout + TOS_STEP[2])
+            sock.connect(socket_path)
+            sock.sendall((json.dumps(request) + "\n").encode())
+            with sock.makefile("rb") as response:
+                line = response.readline()
+        return json.loads(line) if line else None
+    except (OSError, ValueError):
+        return None
+
+
+def file_sha256(path: str) -> Optional[str]:
+    """Hex SHA-256 of a file, or None if it does not exist"""
+    import hashlib
+    
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def run_install_script(paths: InstancePaths, force: bool = False,
+                       progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """Run one instance's install script unless its stamp shows it is already current.
+    
+    Concurrent runs are serialized on a lock next to the stamp, so one that
+    waited finds the stamp current and skips.
+    """
+    if not os.path.exists(paths.install_script_path):
+        raise RuntimeError(f"Install script not found at {paths.install_script_path}")
+    lock_fd = os.open(f"{paths.install_stamp_path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(lock_fd, fcntl.LOCK_EX)
+        return _run_install_script(paths, force, progress)
+    finally:
+        os.close(lock_fd)
+
+def _run_install_script(paths: InstancePaths, force: bool,
+                        progress: Optional[Callable[[str], None]]) -> Dict[str, Any]:
+    from collections import deque
+    
+    echo = progress or (lambda line: None)
+    report = {"skipped": False, "phases": {}}
+    
+    phase_started = time.monotonic()
+    installer_hash = file_sha256(paths.install_script_path)
+    if installer_hash is None:
+        raise RuntimeError(f"Install script not found at {paths.install_script_path}")
+    try:
+        with open(paths.install_stamp_path, 'r') as f:
+            stamp = json.load(f)
+    except (OSError, ValueError):
+        stamp = {}
+    current = (
+        stamp.get("installer_sha256") == installer_hash
+        and stamp.get("binary_sha256") is not None
+        and stamp.get("binary_sha256") == file_sha256(paths.cli_path)
+    )
+    report["phases"]["check"] = round(time.monotonic() - phase_started, 3)
+    metrics_store.observe("phase", "install_check", time.monotonic() - phase_started)
+    if current and not force:
+        report["skipped"] = True
+        return report
+    
+    phase_started = time.monotonic()
+    tail = deque(maxlen=20)
+    process = subprocess.Popen(
+        ["bash", paths.install_script_path],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+        cwd=paths.root
+    )
+    for line in process.stdout:
+        line = line.rstrip("\n")
+        tail.append(line)
+        echo(line)
+    returncode = process.wait()
+    report["phases"]["installer"] = round(time.monotonic() - phase_started, 3)
+    metrics_store.observe("phase", "install_installer", time.monotonic() - phase_started, returncode == 0)
+    if returncode != 0:
+        output = "\n".join(tail)
+        raise RuntimeError(f"install script exited with code {returncode}\n{output}")
+    
+    phase_started = time.monotonic()
+    binary_hash = file_sha256(paths.cli_path)
+    if binary_hash is None:
+        raise RuntimeError(f"install script did not produce {paths.cli_path}")
+    stamp = {
+        "installer_sha256": installer_hash,
+        "binary_sha256": binary_hash,
+        "installed_at": time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime()),
+        "installer_seconds": report["phases"]["installer"]
+    }
+    json_files.atomic_write_json(paths.install_stamp_path, stamp, indent=2)
+    report["phases"]["stamp"] = round(time.monotonic() - phase_started, 3)
+    metrics_store.observe("phase", "install_stamp", time.monotonic() - phase_started)
+    return report
 
 @app.command()
-def install() -> None:
+def install(
+    force: bool = typer.Option(False, "--force", help="Run the installer even if the install stamp is current")
+) -> None:
     """Run the Aethir installation script"""
     typer.echo("🔧 Running Aethir installation...")
     
-    if not os.path.exists(INSTALL_SCRIPT_PATH):
-        typer.echo(f"❌ Install script not found at {INSTALL_SCRIPT_PATH}", err=True)
-        raise typer.Exit(1)
-    
     try:
-        result = subprocess.run(
-            ["bash", INSTALL_SCRIPT_PATH],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        typer.echo("✅ Installation completed successfully")
-        if result.stdout:
-            typer.echo(result.stdout)
-    except subprocess.CalledProcessError as e:
+        with metrics_store.span("operation", "install"):
+            report = run_install_script(InstancePaths.default(), force=force, progress=lambda line: typer.echo(f"   {line}"))
+    except RuntimeError as e:
         typer.echo(f"❌ Installation failed: {e}", err=True)
-        if e.stderr:
-            typer.echo(f"Error output: {e.stderr}", err=True)
         raise typer.Exit(1)
+    
+    if report["skipped"]:
+        typer.echo(f"✅ Installation already current (checked in {report['phases']['check']:.2f}s), use --force to reinstall")
+        return
+    timings = ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in report["phases"].items())
+    typer.echo(f"✅ Installation completed successfully ({timings})")
+
+def create_instance_wallet(paths: InstancePaths, verbose: bool = False) -> Dict[str, str]:
+    """Create a wallet with one instance's CLI and save its keys; raises RuntimeError on failure.
+    
+    Creators hold the wallet lock, so two concurrent callers never both
+    create a wallet: one that had to wait takes the wallet just created.
+    """
+    with wallet_store.WalletLock(paths.wallet_path) as waited:
+        if waited:
+            wallet_data = load_valid_wallet(paths.wallet_path)
+            if wallet_data is not None:
+                log.info("wallet.create", "another process just created the wallet, using it")
+                return wallet_data
+        
+        cli = AethirCLI(paths.cli_path, verbose=verbose)
+        result = cli.interactive_session(WALLET_COMMANDS, parser=WalletOutputParser())
+        # Keys are parsed while the session runs, only the output size is needed from here on
+        result["capture"].close()
+        
+        if result["returncode"] != 0:
+            raise RuntimeError(f"CLI exited with code {result['returncode']}: {result['stderr']}")
+        
+        # Keys were parsed while the session ran
+        wallet_data = result["parsed"]
+        if not wallet_data:
+            log.flush_ring("wallet keys not found")
+            raise RuntimeError(f"Failed to extract wallet keys from {result['capture'].total_chars} chars of CLI output")
+        
+        save_wallet_json(wallet_data, paths.wallet_path)
+        return wallet_data
 
 @app.command()
 def create_wallet() -> None:
@@ -202,46 +1491,15 @@ def create_wallet() -> None:
     if os.path.exists(WALLET_JSON_PATH):
         typer.echo(f"⚠️  Wallet already exists at {WALLET_JSON_PATH}")
         if typer.confirm("Do you want to create a new wallet?"):
-            os.remove(WALLET_JSON_PATH)
+            wallet_store.remove_wallet(WALLET_JSON_PATH)
         else:
             typer.echo("Keeping existing wallet")
             return
     
     try:
-        cli = AethirCLI()
-        
-        # Commands to run in sequence
-        commands = [
-            "y",  # Accept TOS
-            "aethir wallet create",  # Create wallet
-            "aethir wallet export",  # Export keys
-            "aethir exit"  # Properly exit the CLI
-        ]
-        
-        typer.echo("🚀 Starting interactive session...")
-        result = cli.interactive_session(commands)
-        
-        if result["returncode"] != 0:
-            typer.echo(f"❌ CLI exited with code {result['returncode']}", err=True)
-            if result["stderr"]:
-                typer.echo(f"Error: {result['stderr']}", err=True)
-            raise typer.Exit(1)
-        
-        # Debug: Show the raw output
-        typer.echo(f"🔍 CLI stdout length: {len(result['stdout'])}")
-        typer.echo(f"🔍 CLI stderr: {result['stderr']}")
-        
-        # Parse the output to extract keys
-        wallet_data = parse_wallet_output(result["stdout"])
-        
-        if wallet_data:
-            save_wallet_json(wallet_data)
-            typer.echo("✅ Wallet created and saved successfully!")
-        else:
-            typer.echo("❌ Failed to extract wallet keys from output", err=True)
-            typer.echo(f"🔍 CLI Output (first 500 chars):\n{result['stdout'][:500]}", err=True)
-            raise typer.Exit(1)
-            
+        with metrics_store.span("operation", "create-wallet"):
+            create_instance_wallet(InstancePaths.default(), verbose=True)
+        typer.echo("✅ Wallet created and saved successfully!")
     except Exception as e:
         typer.echo(f"❌ Wallet creation failed: {e}", err=True)
         raise typer.Exit(1)
@@ -249,101 +1507,159 @@ def create_wallet() -> None:
 @app.command()
 def status() -> None:
     """Check the status of Aethir CLI and wallet"""
-    typer.echo("📊 Aethir Status Check")
-    
-    # Check CLI binary
-    if os.path.exists(AETHIR_CLI_PATH):
-        typer.echo("✅ Aethir CLI binary found")
-    else:
-        typer.echo("❌ Aethir CLI binary not found")
-    
-    # Check wallet
-    if os.path.exists(WALLET_JSON_PATH):
-        typer.echo("✅ Wallet file found")
-        try:
-            with open(WALLET_JSON_PATH, 'r') as f:
-                wallet_data = json.load(f)
-                if wallet_data.get("private_key") and wallet_data.get("public_key"):
-                    typer.echo("✅ Wallet contains valid keys")
-                else:
-                    typer.echo("⚠️  Wallet file exists but keys are missing")
-        except json.JSONDecodeError:
-            typer.echo("❌ Wallet file is corrupted")
-    else:
-        typer.echo("❌ Wallet file not found")
+    for line in status_report():
+        typer.echo(line)
 
 @app.command()
-def debug_cli() -> None:
+def debug_cli(
+    transport: str = typer.Option(CLI_TRANSPORT, help="Talk to the CLI through a pipe or a pty")
+) -> None:
     """Debug: Test CLI interaction manually with full output"""
-    typer.echo("🔍 Debug: Testing CLI interaction...")
+    typer.echo(f"🔍 Debug: Testing CLI interaction over a {transport}...")
     
     if not os.path.exists(AETHIR_CLI_PATH):
         typer.echo(f"❌ Aethir CLI not found at {AETHIR_CLI_PATH}", err=True)
         raise typer.Exit(1)
     
     try:
-        typer.echo("🚀 Starting CLI process...")
-        process = subprocess.Popen(
-            [AETHIR_CLI_PATH],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        
-        typer.echo("📤 Sending 'y' to accept TOS...")
-        process.stdin.write("y\n")
-        process.stdin.flush()
+        cli = AethirCLI(transport=transport)
+        result = cli.interactive_session([
+            "y",
+            "aethir wallet create",
+            "aethir wallet export",
+            "aethir exit"
+        ])
         
-        typer.echo("⏳ Waiting 15 seconds for CLI initialization...")
-        time.sleep(15)
+        typer.echo("⏱️  Step timings:")
+        for step in result["steps"]:
+            state = "ready" if step["ready"] else "TIMED OUT"
+            typer.echo(f"   {step['command']}: {step['seconds']:.2f}s ({state})")
         
-        typer.echo("📤 Sending 'aethir wallet create'...")
-        process.stdin.write("aethir wallet create\n")
-        process.stdin.flush()
-        
-        typer.echo("⏳ Waiting 10 seconds for wallet creation...")
-        time.sleep(10)
+        typer.echo("🔍 RAW CLI OUTPUT:")
+        typer.echo("=" * 50)
+        # Line by line, so a spilled capture is read through mmap rather than joined in memory
+        try:
+            for line in result["capture"].lines():
+                typer.echo(repr(line))
+        finally:
+            result["capture"].close()
+        typer.echo("=" * 50)
         
-        typer.echo("📤 Sending 'aethir wallet export'...")
-        process.stdin.write("aethir wallet export\n")
-        process.stdin.flush()
+        if result["stderr"]:
+            typer.echo("🔍 RAW CLI STDERR:")
+            typer.echo(repr(result["stderr"]))
         
-        typer.echo("⏳ Waiting 5 seconds for export...")
-        time.sleep(5)
+        typer.echo(f"✅ CLI process completed with return code: {cli.process.returncode}")
         
-        typer.echo("📤 Sending 'exit'...")
-        process.stdin.write("exit\n")
-        process.stdin.close()
+    except Exception as e:
+        typer.echo(f"❌ Debug failed: {e}", err=True)
+        raise typer.Exit(1)
+
+@app.command()
+def serve(
+    socket_path: str = typer.Option(CHECKER_SOCKET_PATH, help="Unix socket to listen on"),
+    preload: bool = typer.Option(True, help="Start and initialize the CLI before the first request"),
+    wait_install: float = typer.Option(0, help="Seconds to wait for the install stamp and the wallet before starting (0: don't wait)")
+) -> None:
+    """Keep one initialized CLI session alive behind a Unix socket"""
+    import signal
+    
+    if wait_install > 0:
+        paths = InstancePaths.default()
+        deadline = time.monotonic() + wait_install
+        if wait_for_file(paths.install_stamp_path, lambda path: True if os.path.exists(path) else None, wait_install) is None:
+            typer.echo(f"❌ No install stamp at {paths.install_stamp_path} after {wait_install:g}s", err=True)
+            raise typer.Exit(1)
+        # Boot creates the wallet after the install; a session started before that would never see it
+        if wait_for_wallet(paths.wallet_path, max(0.0, deadline - time.monotonic())) is None:
+            typer.echo(f"❌ No valid wallet at {paths.wallet_path} after {wait_install:g}s", err=True)
+            raise typer.Exit(1)
+    if not os.path.exists(AETHIR_CLI_PATH):
+        typer.echo(f"❌ Aethir CLI not found at {AETHIR_CLI_PATH}", err=True)
+        raise typer.Exit(1)
+    
+    async def main():
+        daemon = CheckerDaemon()
         
-        typer.echo("⏳ Waiting for process to complete...")
-        stdout, stderr = process.communicate(timeout=30)
+        async def handle(reader, writer):
+            # One JSON request per line, one JSON response per line
+            try:
+                async for line in reader:
+                    try:
+                        request = json.loads(line)
+                        if request.get("op") == "ping":
+                            response = daemon.ping()
+                        else:
+                            response = await daemon.execute(str(request["command"]), float(request.get("timeout", DEFAULT_STEP_TIMEOUT)))
+                    except (ValueError, KeyError, TypeError) as e:
+                        response = {"ok": False, "error": f"bad request: {e}"}
+                    writer.write((json.dumps(response) + "\n").encode())
+                    await writer.drain()
+            except ConnectionError:
+                pass
+            finally:
+                writer.close()
         
-        typer.echo("🔍 RAW CLI OUTPUT:")
-        typer.echo("=" * 50)
-        typer.echo(repr(stdout))
-        typer.echo("=" * 50)
+        os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = await asyncio.start_unix_server(handle, path=socket_path)
+        os.chmod(socket_path, 0o600)
         
-        if stderr:
-            typer.echo("🔍 RAW CLI STDERR:")
-            typer.echo(repr(stderr))
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGTERM, stop.set)
+        loop.add_signal_handler(signal.SIGINT, stop.set)
         
-        typer.echo(f"✅ CLI process completed with return code: {process.returncode}")
+        if preload:
+            try:
+                async with daemon.lock:
+                    await daemon._ensure_session()
+            except Exception as e:
+                typer.echo(f"⚠️ Could not preload CLI session: {e}")
         
-    except Exception as e:
-        typer.echo(f"❌ Debug failed: {e}", err=True)
+        typer.echo(f"🚀 Checker session daemon listening on {socket_path}")
+        try:
+            await stop.wait()
+        finally:
+            server.close()
+            await server.wait_closed()
+            await daemon.close()
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            typer.echo("👋 Checker session daemon stopped")
+    
+    asyncio.run(main())
+
+@app.command()
+def license_probe(
+    cli_path: Optional[List[str]] = typer.Option(None, "--cli-path", help="Checker CLI to probe (repeatable)"),
+    timeout: float = typer.Option(60, help="Per-session timeout in seconds")
+) -> None:
+    """Query license summary from several checker installs concurrently"""
+    jobs = [
+        {"cli_path": path, "command": "aethir license summary", "parser": LicenseOutputParser()}
+        for path in (cli_path or [AETHIR_CLI_PATH])
+    ]
+    results = asyncio.run(run_sessions(jobs, timeout))
+    for job, result in zip(jobs, results):
+        parser = job["parser"]
+        result["license"] = parser.result() if result["ok"] and parser.recognized else None
+        result.pop("output", None)
+    
+    # Print ONLY JSON for hooks to consume
+    print(json.dumps(results, indent=2))
+    if not all(result["ok"] for result in results):
         raise typer.Exit(1)
 
 @app.command()
 def show_wallet() -> None:
     """Display wallet information"""
-    if not os.path.exists(WALLET_JSON_PATH):
-        typer.echo("❌ No wallet found. Run 'create-wallet' first.", err=True)
-        raise typer.Exit(1)
-    
     try:
-        with open(WALLET_JSON_PATH, 'r') as f:
-            wallet_data = json.load(f)
+        wallet_data = wallet_store.read_wallet(WALLET_JSON_PATH)
+        if wallet_data is None:
+            typer.echo("❌ No wallet found. Run 'create-wallet' first.", err=True)
+            raise typer.Exit(1)
         
         typer.echo("🔑 Wallet Information:")
         typer.echo(f"Private Key: {wallet_data.get('private_key', 'Not found')}")
@@ -353,130 +1669,397 @@ def show_wallet() -> None:
         typer.echo("❌ Wallet file is corrupted", err=True)
         raise typer.Exit(1)
 
-def parse_wallet_output(output: str) -> Optional[Dict[str, str]]:
-    """Parse wallet keys from CLI output based on actual format"""
-    try:
-        lines = output.split('\n')
-        private_key = None
-        public_key = None
-        
-        # Look for keys in the entire output (both create and export sections)
-        for i, line in enumerate(lines):
-            if "Current private key:" in line:
-                # Look for the base64 key in the next few lines
-                for j in range(i+1, min(i+15, len(lines))):
-                    key_line = lines[j].strip()
-                    if key_line and len(key_line) > 50 and not key_line.startswith("Current") and not key_line.startswith("***************************************"):
-                        private_key = key_line
-                        typer.echo(f"🔍 Found private key: {key_line[:50]}...")
-                        break
-            
-            elif "Current public key:" in line:
-                # Look for the hex key in the next few lines
-                for j in range(i+1, min(i+5, len(lines))):
-                    key_line = lines[j].strip()
-                    if key_line and len(key_line) == 40 and not key_line.startswith("Current") and not key_line.startswith("***************************************"):
-                        public_key = key_line
-                        typer.echo(f"🔍 Found public key: {key_line}")
-                        break
-        
-        typer.echo(f"🔍 Parsed private key: {'Found' if private_key else 'Not found'}")
-        typer.echo(f"🔍 Parsed public key: {'Found' if public_key else 'Not found'}")
-        
-        if private_key and public_key:
-            return {
-                "private_key": private_key,
-                "public_key": public_key
-            }
-        
-        return None
+class LineParser:
+    """Incremental, line-fed parser base class.
+    
+    feed() accepts raw output chunks as they arrive and hands complete lines to
+    feed_line(); subclasses set self.complete once they have everything they
+    need, so a session can stop waiting on the CLI as early as possible.
+    Lines fed after that still count, so a later value replaces an earlier one
+    just like when the whole output was parsed at once.
+    """
+    
+    def __init__(self):
+        self.complete = False
+        self._partial = ""
+    
+    def feed(self, text: str) -> None:
+        """Feed a raw output chunk; a trailing partial line is kept for the next chunk"""
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        for line in lines:
+            self.feed_line(line.rstrip("\r"))
+    
+    def close(self) -> None:
+        """Flush the trailing partial line once no more output will arrive"""
+        if self._partial:
+            self.feed_line(self._partial.rstrip("\r"))
+        self._partial = ""
+    
+    def feed_line(self, line: str) -> None:
+        raise NotImplementedError
+    
+    def result(self) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+
+class WalletOutputParser(LineParser):
+    """Captures the wallet keys printed after 'Current private key:' / 'Current public key:'.
+    
+    The last key printed wins, so the export section takes precedence over
+    the create section before it.
+    """
+    
+    # (field, marker, look-ahead lines after the marker, accepts a candidate key line)
+    SECTIONS = [
+        ("private_key", "Current private key:", 14, lambda line: len(line) > 50),
+        ("public_key", "Current public key:", 4, lambda line: len(line) == 40),
+    ]
+    
+    def __init__(self):
+        super().__init__()
+        self.keys = {}
+        self._section = None
+        self._lines_left = 0
+    
+    def feed_line(self, line: str) -> None:
+        for section in self.SECTIONS:
+            if section[1] in line:
+                self._section = section
+                self._lines_left = section[2]
+                return
+        if self._section is None:
+            return
         
-    except Exception as e:
-        typer.echo(f"❌ Error parsing wallet output: {e}", err=True)
-        return None
+        # Look for the key within the next few lines after its marker
+        field, _, _, accepts = self._section
+        key_line = line.strip()
+        if key_line and accepts(key_line) and not key_line.startswith("Current") and not key_line.startswith("***************************************"):
+            self.keys[field] = key_line
+            self._section = None
+        else:
+            self._lines_left -= 1
+            if self._lines_left <= 0:
+                self._section = None
+        self.complete = len(self.keys) == len(self.SECTIONS)
+    
+    def result(self) -> Optional[Dict[str, str]]:
+        if not self.complete:
+            return None
+        return {
+            "private_key": self.keys["private_key"],
+            "public_key": self.keys["public_key"]
+        }
+
 
-def save_wallet_json(wallet_data: Dict[str, str]) -> None:
-    """Save wallet data to JSON file"""
+def save_wallet_json(wallet_data: Dict[str, str], path: str = WALLET_JSON_PATH) -> None:
+    """Save wallet data to JSON file (atomically, see wallet_store.write_wallet)"""
     try:
-        with open(WALLET_JSON_PATH, 'w') as f:
-            json.dump(wallet_data, f, indent=2)
+        wallet_store.write_wallet(wallet_data, path)
     except Exception as e:
         typer.echo(f"❌ Error saving wallet: {e}", err=True)
         raise
 
+def load_valid_wallet(path: str = WALLET_JSON_PATH) -> Optional[Dict[str, str]]:
+    """Return the wallet if the file is complete (parses and has both keys), else None"""
+    try:
+        wallet_data = wallet_store.read_wallet(path)
+    except (OSError, ValueError):
+        return None
+    return wallet_data if wallet_store.has_keys(wallet_data) else None
+
+def inotify_watch(directory: str) -> Optional[int]:
+    """Watch a directory for finished writes and renames; None if inotify is unavailable"""
+    import ctypes
+    import ctypes.util
+    
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    if libc.inotify_add_watch(fd, directory.encode(), IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+def wait_for_wallet(path: str = WALLET_JSON_PATH, timeout: Optional[float] = None,
+                    poll_interval: float = 1.0) -> Optional[Dict[str, str]]:
+    """Block until a complete, valid wallet file exists at path; None on timeout.
+    
+    The file is re-validated on every change, so a partially written wallet
+    never counts.
+    """
+    return wait_for_file(path, load_valid_wallet, timeout, poll_interval)
+
+def wait_for_file(path: str, check: Callable[[str], Any], timeout: Optional[float] = None,
+                  poll_interval: float = 1.0) -> Any:
+    """Block until check(path) returns something other than None and return it; None on timeout.
+    
+    Uses inotify on the parent directory so the file is seen as soon as its
+    writer closes or renames it, and falls back to polling every poll_interval
+    seconds when inotify is unavailable.
+    """
+    import select
+    
+    deadline = None if timeout is None else time.monotonic() + timeout
+    directory = os.path.dirname(os.path.abspath(path))
+    fd = inotify_watch(directory) if os.path.isdir(directory) else None
+    try:
+        while True:
+            found = check(path)
+            if found is not None:
+                return found
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            if fd is None:
+                time.sleep(poll_interval if remaining is None else min(poll_interval, remaining))
+                continue
+            # Re-check now and then even without events, in case one was missed
+            wait = 30.0 if remaining is None else min(30.0, remaining)
+            readable, _, _ = select.select([fd], [], [], wait)
+            if readable:
+                try:
+                    while os.read(fd, 4096):
+                        pass
+                except BlockingIOError:
+                    pass
+    finally:
+        if fd is not None:
+            os.close(fd)
+
+@app.command()
+def watch_wallet(
+    timeout: Optional[float] = typer.Option(None, help="Give up after this many seconds (default: wait forever)"),
+    poll_interval: float = typer.Option(1.0, help="Polling interval when inotify is unavailable"),
+    start_riptide: bool = typer.Option(True, help="Start the Riptide manager once the wallet is ready")
+) -> None:
+    """Wait for a complete wallet.json, then hand over to the Riptide manager"""
+    typer.echo(f"⏳ Waiting for a valid wallet at {WALLET_JSON_PATH}...")
+    started = time.monotonic()
+    wallet_data = wait_for_wallet(WALLET_JSON_PATH, timeout, poll_interval)
+    if wallet_data is None:
+        typer.echo(f"❌ No valid wallet after {timeout}s", err=True)
+        raise typer.Exit(1)
+    typer.echo(f"✅ Wallet detected after {time.monotonic() - started:.2f}s")
+    
+    # Reset the flag so first heartbeat includes wallet keys
+    if os.path.exists(WALLET_SENT_FLAG_PATH):
+        os.remove(WALLET_SENT_FLAG_PATH)
+    typer.echo("Reset wallet sent flag - first heartbeat will include keys")
+    
+    if start_riptide:
+        result = subprocess.run(["systemctl", "start", RIPTIDE_MANAGER_SERVICE], capture_output=True, text=True)
+        if result.returncode != 0:
+            typer.echo(f"❌ Could not start {RIPTIDE_MANAGER_SERVICE}: {result.stderr.strip()}", err=True)
+            raise typer.Exit(1)
+        typer.echo(f"✅ {RIPTIDE_MANAGER_SERVICE} started")
+
+def fetch_license_status(cli_path: str = AETHIR_CLI_PATH) -> Dict[str, Any]:
+    """Run 'aethir license summary' and parse it; raises on CLI or parse failure"""
+    parser = LicenseOutputParser()
+    AethirCLI(cli_path, verbose=False).run_command("aethir license summary", timeout=DEFAULT_STEP_TIMEOUT, parser=parser)
+    # The prompt came back, so the summary is over even if it left out a row
+    if not parser.recognized:
+        raise RuntimeError("could not parse license summary output")
+    license_data = parser.result()
+    record_license_sample(license_data)
+    return license_data
+
+
+def record_license_sample(license_data: Dict[str, Any]) -> None:
+    """Append a freshly parsed license summary to the on-disk history"""
+    try:
+        license_history.append(LICENSE_HISTORY_PATH, license_data)
+    except OSError as e:
+        log.warning("license.history", f"could not record license sample: {e}")
+
+
+def write_license_cache(entry: Dict[str, Any]) -> None:
+    """Replace the cache file atomically so readers never see a partial entry"""
+    os.makedirs(os.path.dirname(LICENSE_CACHE_PATH), exist_ok=True)
+    json_files.atomic_write_json(LICENSE_CACHE_PATH, entry)
+
+
+def refresh_license_cache() -> Dict[str, Any]:
+    """Query the CLI and update the cache; the caller must hold the refresh lock.
+    
+    A failed refresh keeps the last good value and only records the error.
+    """
+    entry = read_license_cache() or {}
+    entry["last_attempt"] = time.time()
+    with metrics_store.span("operation", "license-refresh") as timing:
+        try:
+            entry["data"] = fetch_license_status()
+            entry["fetched_at"] = entry["last_attempt"]
+            entry.pop("last_error", None)
+        except Exception as e:
+            entry["last_error"] = str(e)
+            timing.ok = False
+    write_license_cache(entry)
+    return entry
+
+
+def license_status_data(ttl: float = LICENSE_CACHE_TTL) -> Dict[str, Any]:
+    """Return license status from the cache, refreshing it when missing or stale"""
+    cached = cached_license_status(ttl)
+    if cached is not None:
+        return cached
+    
+    # Nothing to serve yet: fetch now, or wait for the refresh already in flight
+    lock_fd = open_license_lock()
+    try:
+        fcntl.flock(lock_fd, fcntl.LOCK_EX)
+        entry = read_license_cache()
+        if entry is None or time.time() - entry.get("last_attempt", 0) > ttl:
+            entry = refresh_license_cache()
+    finally:
+        os.close(lock_fd)
+    return license_status_response(entry, ttl)
+
+
 @app.command()
-def license_status():
+def license_status(
+    ttl: float = typer.Option(LICENSE_CACHE_TTL, help="Seconds before the cached value is refreshed")
+):
     """Get Aethir license status and return as JSON"""
-    typer.echo("🔍 Getting Aethir license status...")
-    
-    # For now, return a basic status since CLI is hanging
-    # This will be improved once we figure out the CLI issue
-    license_data = {
-        "checking": 0,
-        "ready": 0,
-        "offline": 0,
-        "banned": 0,
-        "pending": 0,
-        "total_delegated": 0,
-        "status": "cli_hanging",
-        "message": "Aethir CLI is hanging, using fallback status",
-        "online_total": 0,
-        "offline_total": 0,
-        "cli_accessible": False,
-        "last_check": time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime())
-    }
+    with metrics_store.span("operation", "license-status") as timing:
+        license_data = license_status_data(ttl)
+        timing.ok = license_data["cached"]
     
-    # Print as JSON for hooks to consume
-    typer.echo(json.dumps(license_data, indent=2))
+    # Print ONLY JSON for hooks to consume
+    print(json.dumps(license_data, indent=2))
+    if not license_data["cached"]:
+        raise typer.Exit(1)
 
-def parse_license_output(output: str) -> Optional[Dict[str, Any]]:
-    """Parse license summary output and return structured data"""
+
+def parse_since(value: str) -> float:
+    """Unix timestamp from either a timestamp or a duration ago such as 90s, 30m, 12h or 7d"""
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
     try:
-        lines = output.split('\n')
-        license_data = {
-            "checking": 0,
-            "ready": 0,
-            "offline": 0,
-            "banned": 0,
-            "pending": 0,
-            "total_delegated": 0,
-            "status": "unknown",
-            "message": ""
-        }
-        
+        if value[-1:] in units:
+            return time.time() - float(value[:-1]) * units[value[-1]]
+        return float(value)
+    except ValueError:
+        raise ValueError(f"invalid time '{value}', expected a Unix timestamp or a duration like 30m")
+
+
+def license_history_data(since: Optional[float] = None, last: Optional[int] = None,
+                         changes_only: bool = False) -> Dict[str, Any]:
+    """Samples from the license history ring plus time spent offline, without touching the CLI.
+    
+    Offline time covers [since, now], or the whole recorded history without since.
+    """
+    samples, capacity, total = license_history.read(LICENSE_HISTORY_PATH)
+    now = time.time()
+    window_start = since if since is not None else (samples[0]["timestamp"] if samples else now)
+    offline_seconds = license_history.time_in_status(samples, "offline", window_start, now)
+    
+    selected = license_history.changes(samples) if changes_only else samples
+    if since is not None:
+        selected = [sample for sample in selected if sample["timestamp"] >= since]
+    if last is not None:
+        selected = selected[-last:] if last > 0 else []
+    for sample in selected:
+        sample["time"] = time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime(sample["timestamp"]))
+    return {
+        "samples": selected,
+        "window_start": round(window_start, 3),
+        "offline_seconds": round(offline_seconds, 1),
+        "stored_samples": len(samples),
+        "total_samples": total,
+        "capacity": capacity,
+        "oldest": samples[0]["timestamp"] if samples else None
+    }
+
+
+@app.command("license-history")
+def license_history_command(
+    since: Optional[str] = typer.Option(None, help="Only samples since this Unix timestamp or duration ago (90s, 30m, 12h, 7d)"),
+    last: Optional[int] = typer.Option(None, help="Only the last N samples"),
+    changes: bool = typer.Option(False, "--changes", help="Only samples where the counts or status changed")
+):
+    """Show recorded license status samples and time spent offline as JSON"""
+    try:
+        since_timestamp = parse_since(since) if since else None
+    except ValueError:
+        typer.echo(f"❌ Invalid --since value '{since}'", err=True)
+        raise typer.Exit(1)
+    print(json.dumps(license_history_data(since_timestamp, last, changes), indent=2))
+
+
+@app.command(hidden=True)
+def refresh_license_status(
+    lock_fd: Optional[int] = typer.Option(None, help="Already locked refresh lock inherited from the parent")
+):
+    """Refresh the license status cache (spawned in the background by license-status)"""
+    if lock_fd is None:
+        lock_fd = open_license_lock()
+        fcntl.flock(lock_fd, fcntl.LOCK_EX)
+    try:
+        refresh_license_cache()
+    finally:
+        os.close(lock_fd)
+
+class LicenseOutputParser(LineParser):
+    """Collects the counts printed by 'aethir license summary'"""
+    
+    # Row label in the summary -> field name, in the order the CLI prints them
+    COUNTS = [
+        ("Checking", "checking"),
+        ("Ready", "ready"),
+        ("Offline", "offline"),
+        ("Banned", "banned"),
+        ("Pending", "pending"),
+        ("Total Delegated", "total_delegated"),
+    ]
+    
+    def __init__(self):
+        super().__init__()
+        self.counts = {field: 0 for _, field in self.COUNTS}
+        self.seen = set()
+        self.no_licenses = False
+    
+    def feed_line(self, line: str) -> None:
         # Check for "No licenses delegated" message
-        if "No licenses delegated to your burner wallet" in output:
+        if "No licenses delegated to your burner wallet" in line:
+            self.no_licenses = True
+            self.complete = True
+            return
+        
+        for label, field in self.COUNTS:
+            if label in line:
+                words = line.split()
+                if len(words) >= 2 and words[0].isdigit():
+                    self.counts[field] = int(words[0])
+                    self.seen.add(field)
+                    # Every row in, whatever order the CLI prints them in: no need to wait for the prompt
+                    self.complete = len(self.seen) == len(self.COUNTS)
+                return
+    
+    @property
+    def recognized(self) -> bool:
+        """Whether any of the summary was seen; rows the CLI left out count as 0"""
+        return self.no_licenses or bool(self.seen)
+    
+    def result(self) -> Dict[str, Any]:
+        license_data = dict(self.counts)
+        license_data.update({"status": "unknown", "message": ""})
+        
+        if self.no_licenses:
             license_data["status"] = "ready_to_receive"
             license_data["message"] = "Wallet ready, waiting for delegations"
             return license_data
         
-        # Parse license counts
-        for line in lines:
-            if "Checking" in line:
-                match = line.split()
-                if len(match) >= 2:
-                    license_data["checking"] = int(match[0])
-            elif "Ready" in line:
-                match = line.split()
-                if len(match) >= 2:
-                    license_data["ready"] = int(match[0])
-            elif "Offline" in line:
-                match = line.split()
-                if len(match) >= 2:
-                    license_data["offline"] = int(match[0])
-            elif "Banned" in line:
-                match = line.split()
-                if len(match) >= 2:
-                    license_data["banned"] = int(match[0])
-            elif "Pending" in line:
-                match = line.split()
-                if len(match) >= 2:
-                    license_data["pending"] = int(match[0])
-            elif "Total Delegated" in line:
-                match = line.split()
-                if len(match) >= 2:
-                    license_data["total_delegated"] = int(match[0])
-        
         # Calculate online/offline totals
         online_total = license_data["checking"] + license_data["ready"]
         offline_total = license_data["offline"] + license_data["banned"]
@@ -495,45 +2078,746 @@ def parse_license_output(output: str) -> Optional[Dict[str, Any]]:
         license_data["offline_total"] = offline_total
         
         return license_data
+
+
+class VersionOutputParser(LineParser):
+    """Picks the first dotted version number out of 'aethir version' output"""
+    
+    def __init__(self):
+        super().__init__()
+        self.version = None
+    
+    def feed_line(self, line: str) -> None:
+        import re
         
-    except Exception as e:
-        typer.echo(f"❌ Error parsing license output: {e}", err=True)
-        return None
+        if self.complete:
+            return
+        match = re.search(r"\b\d+(?:\.\d+){1,3}\b", line)
+        if match:
+            self.version = match.group(0)
+            self.complete = True
+    
+    def result(self) -> Optional[str]:
+        return self.version
+
+
+# Parser for a command's section of batch output
+COMMAND_PARSERS = {
+    "aethir version": VersionOutputParser,
+    "aethir license summary": LicenseOutputParser,
+    "aethir wallet export": WalletOutputParser,
+}
+SNAPSHOT_COMMANDS = ["aethir version", "aethir license summary", "aethir wallet export"]
+
+
+@app.command()
+def snapshot(
+    command: Optional[List[str]] = typer.Option(None, "--command", help="Command to include (repeatable, default: version, license summary, wallet export)"),
+    timeout: float = typer.Option(DEFAULT_STEP_TIMEOUT, help="Seconds to wait for each command's prompt")
+) -> None:
+    """Collect version, license summary and wallet public key from one CLI session as JSON"""
+    result = AethirCLI(verbose=False).batch(command or SNAPSHOT_COMMANDS, timeout=timeout)
+    
+    snapshot_data = {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime()),
+        "ok": result["ok"],
+        "via": result["via"],
+        "startup_seconds": result["startup_seconds"],
+        "total_seconds": result["total_seconds"],
+        "sections": []
+    }
+    if "error" in result:
+        snapshot_data["error"] = result["error"]
+    for section in result["sections"]:
+        snapshot_data["sections"].append({key: section[key] for key in ("command", "ok", "seconds") if key in section})
+        if "error" in section:
+            snapshot_data["sections"][-1]["error"] = section["error"]
+        parsed = section.get("parsed")
+        if section["command"] == "aethir version":
+            snapshot_data["version"] = parsed
+        elif section["command"] == "aethir license summary" and parsed is not None:
+            snapshot_data["license"] = parsed
+            record_license_sample(parsed)
+        elif section["command"] == "aethir wallet export":
+            # Monitoring output never carries the private key
+            snapshot_data["wallet"] = {
+                "public_key": parsed["public_key"] if parsed else None,
+                "has_private_key": bool(parsed and parsed.get("private_key"))
+            }
+        elif section["command"] not in COMMAND_PARSERS and section["ok"]:
+            snapshot_data.setdefault("outputs", {})[section["command"]] = redact_secrets(section["output"])
+    
+    # Print ONLY JSON for hooks to consume
+    print(json.dumps(snapshot_data, indent=2))
+    if not result["ok"]:
+        raise typer.Exit(1)
 
 @app.command()
 def basic_status():
     """Get basic Aethir status without running CLI"""
-    # Don't echo debug messages when called from hooks
-    # typer.echo("🔍 Getting basic Aethir status...")
+    # Print ONLY JSON for hooks to consume (no emojis or debug messages)
+    print(json.dumps(basic_status_data(), indent=2))
+
+@app.command()
+def metrics(
+    output_format: str = typer.Option("prometheus", "--format", help="Output format: prometheus or json")
+) -> None:
+    """Print phase and command timing histograms recorded by earlier runs"""
+    if output_format not in ("prometheus", "json"):
+        typer.echo(f"❌ Unknown format '{output_format}', use prometheus or json", err=True)
+        raise typer.Exit(1)
+    typer.echo(metrics_report(output_format).rstrip("\n"))
+
+# Seconds of the hook deadline kept back so a probe can kill its child processes in time
+PROBE_CLEANUP_MARGIN = 0.5
+
+
+def run_probes(probes: Dict[str, Callable[[float], Any]], deadline: float) -> Dict[str, Dict[str, Any]]:
+    """Run probes concurrently and collect whatever finished within the deadline.
     
-    status_data = {
-        "wallet_exists": os.path.exists(WALLET_JSON_PATH),
-        "cli_exists": os.path.exists(AETHIR_CLI_PATH),
-        "install_script_exists": os.path.exists(INSTALL_SCRIPT_PATH),
+    Each probe gets what is left of the deadline, less PROBE_CLEANUP_MARGIN,
+    as its own timeout, so it stops and reaps its child processes before the
+    caller exits. Probes run on daemon threads rather than a
+    ThreadPoolExecutor, whose workers are joined at interpreter exit, so a
+    probe stuck past the deadline can't hold the process open. Probes still running at the deadline are reported with
+    timed_out and an exception is reported as that probe's error.
+    """
+    import threading
+    
+    results = {}
+    lock = threading.Lock()
+    finished = threading.Condition(lock)
+    started = time.monotonic()
+    
+    def run(name: str, probe: Callable[[float], Any]) -> None:
+        probe_started = time.monotonic()
+        budget = max(0.0, deadline - (probe_started - started) - min(PROBE_CLEANUP_MARGIN, deadline / 2))
+        try:
+            outcome = {"ok": True, "result": probe(budget)}
+        except Exception as e:
+            outcome = {"ok": False, "error": str(e) or type(e).__name__}
+        outcome["seconds"] = round(time.monotonic() - probe_started, 3)
+        metrics_store.observe("phase", f"probe_{name}", outcome["seconds"], outcome["ok"])
+        with finished:
+            results[name] = outcome
+            finished.notify()
+    
+    for name, probe in probes.items():
+        threading.Thread(target=run, args=(name, probe), name=f"probe-{name}", daemon=True).start()
+    with finished:
+        finished.wait_for(lambda: len(results) == len(probes), timeout=deadline)
+        snapshot = dict(results)
+    for name in probes:
+        if name not in snapshot:
+            snapshot[name] = {"ok": False, "timed_out": True, "seconds": round(time.monotonic() - started, 3),
+                              "error": f"no answer within the {deadline:g}s deadline"}
+    return snapshot
+
+
+def probe_service_state(timeout: float) -> str:
+    """systemctl is-active for the checker service ('active', 'inactive', 'failed', ...)"""
+    result = subprocess.run(["systemctl", "is-active", f"{CHECKER_SERVICE}.service"],
+                            capture_output=True, text=True, timeout=timeout)
+    if not result.stdout.strip():
+        raise RuntimeError(result.stderr.strip() or f"systemctl exited with code {result.returncode}")
+    return result.stdout.strip()
+
+
+def probe_cli(timeout: float) -> Dict[str, Any]:
+    """Whether the CLI responds: the daemon's live session if there is one, else --version"""
+    import signal
+    
+    daemon = query_checker_daemon(timeout=timeout)
+    if daemon is not None:
+        return {"alive": daemon.get("session_alive", False), "via": "daemon", "pid": daemon.get("pid")}
+    breaker = breaker_status()
+    if breaker["state"] == "open":
+        return {"alive": False, "via": "breaker", "breaker": breaker}
+    
+    def run_version() -> Dict[str, Any]:
+        process = subprocess.Popen([AETHIR_CLI_PATH, "--version"], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE, text=True, cwd=cli_workdir(AETHIR_CLI_PATH),
+                                   start_new_session=True)
+        try:
+            stdout, _ = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+            process.communicate()
+            record_cli_outcome(True)
+            raise
+        return {"alive": process.returncode == 0, "via": "version", "version": stdout.strip() or None}
+    
+    # Hooks firing together share one --version run
+    return single_flight(flight_key(AETHIR_CLI_PATH, ["--version"]), run_version)[0]
+
+
+def probe_license_status(timeout: float) -> Dict[str, Any]:
+    """Cached license status; with nothing cached a background refresh is started instead of blocking"""
+    cached = cached_license_status()
+    if cached is not None:
+        return cached
+    entry = read_license_cache()
+    if license_refresh_due(entry, LICENSE_CACHE_TTL):
+        spawn_license_refresh()
+    return license_status_response(entry, LICENSE_CACHE_TTL)
+
+
+def probe_riptide_config(timeout: float) -> Dict[str, Any]:
+    with open(RIPTIDE_CONFIG_PATH, 'r') as f:
+        json.load(f)
+    return {"valid": True}
+
+
+HOOK_PROBES = {
+    "service": probe_service_state,
+    "basic_status": lambda timeout: basic_status_data(),
+    "license_status": probe_license_status,
+    "cli": probe_cli,
+    "riptide_config": probe_riptide_config,
+    "license_history": lambda timeout: license_history_data(since=time.time() - 3600, last=0),
+    "timings": lambda timeout: metrics_store.summary(metrics_store.load(METRICS_STATE_PATH))["metrics"],
+}
+
+
+@app.command()
+def hook_snapshot(
+    deadline: float = typer.Option(10.0, help="Seconds to wait for all probes together"),
+    skip: Optional[List[str]] = typer.Option(None, "--skip", help=f"Probe to leave out (repeatable): {', '.join(HOOK_PROBES)}")
+) -> None:
+    """Run every check the Riptide hooks need concurrently and print one JSON document"""
+    started = time.monotonic()
+    probes = {name: probe for name, probe in HOOK_PROBES.items() if name not in (skip or [])}
+    with metrics_store.span("operation", "hook-snapshot") as timing:
+        results = run_probes(probes, deadline)
+        failed = sorted(name for name, result in results.items() if not result["ok"])
+        timing.ok = not failed
+    
+    # Print ONLY JSON for hooks to consume; failed probes are marked, not fatal
+    print(json.dumps({
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime()),
+        "ok": not failed,
+        "partial": bool(failed) and len(failed) < len(results),
+        "failed": failed,
+        "deadline_seconds": deadline,
+        "total_seconds": round(time.monotonic() - started, 3),
+        "probes": results
+    }, indent=2))
+
+# Entry points the hooks fire; all but the text ones must print JSON
+LOAD_TEST_COMMANDS = ["basic-status", "license-status", "status"]
+TEXT_OUTPUT_COMMANDS = {"status", "metrics", "install", "create-wallet"}
+
+
+def wallet_read_error(command: str, stdout: str) -> Optional[str]:
+    """A wallet problem reported by a status command, which means a reader saw a broken wallet"""
+    if command == "basic-status":
+        try:
+            data = json.loads(stdout)
+        except ValueError:
+            return None
+        if data.get("wallet_error"):
+            return data["wallet_error"]
+        if data.get("wallet_exists") and not data.get("wallet_has_keys"):
+            return "wallet without keys"
+    elif command == "status":
+        for problem in ("Wallet file is corrupted", "keys are missing"):
+            if problem in stdout:
+                return problem
+    return None
+
+
+def timed_call(args: list[str], timeout: float) -> Dict[str, Any]:
+    """Run this script with args; returns wall time, the child's CPU time and peak RSS, and any error"""
+    import tempfile
+    import threading
+    
+    started = time.perf_counter()
+    with tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen([sys.executable, os.path.abspath(__file__), *args],
+                                   stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=stderr_file)
+        timer = threading.Timer(timeout, process.kill)
+        timer.start()
+        try:
+            stdout = process.stdout.read().decode("utf-8", errors="replace")
+            process.stdout.close()
+            # wait4 instead of wait: the child's own rusage, not all children's
+            _, wait_status, usage = os.wait4(process.pid, 0)
+        finally:
+            timer.cancel()
+        process.returncode = os.waitstatus_to_exitcode(wait_status)
+        stderr_file.seek(0)
+        stderr = stderr_file.read().decode("utf-8", errors="replace")
+    
+    command = args[0]
+    result = {
+        "command": " ".join(args),
+        "ms": round((time.perf_counter() - started) * 1000, 2),
+        "cpu_ms": round((usage.ru_utime + usage.ru_stime) * 1000, 2),
+        "rss_mb": round(usage.ru_maxrss / 1024, 1),
+        "error": None,
+        "wallet_error": wallet_read_error(command, stdout)
+    }
+    if process.returncode != 0:
+        reason = "killed after timeout" if process.returncode == -9 else f"exit code {process.returncode}"
+        result["error"] = f"{reason}: {stderr.strip()[-200:]}"
+    elif command not in TEXT_OUTPUT_COMMANDS:
+        try:
+            json.loads(stdout)
+        except ValueError:
+            result["error"] = "output is not JSON"
+    if result["wallet_error"] and not result["error"]:
+        result["error"] = f"wallet read error: {result['wallet_error']}"
+    return result
+
+
+def run_load_test(commands: list[list[str]], concurrency: int, rate: float, duration: float,
+                  call_timeout: float, background: list[list[str]]) -> Dict[str, Any]:
+    """Fire commands round-robin from `concurrency` workers for `duration` seconds.
+    
+    With a rate, calls are started on a fixed schedule (rate per second over
+    all workers) and start late when every worker is busy; without one, each
+    worker starts its next call as soon as the last one returned. Background
+    commands are re-run back to back on their own threads for the whole time.
+    """
+    import itertools
+    import threading
+    
+    lock = threading.Lock()
+    order = itertools.cycle(commands)
+    calls, background_calls = [], []
+    started = time.monotonic()
+    stop_at = started + duration
+    schedule = {"next": started}
+    
+    def next_call() -> tuple:
+        with lock:
+            if rate > 0:
+                slot = schedule["next"]
+                schedule["next"] += 1.0 / rate
+            else:
+                slot = time.monotonic()
+            return next(order), slot
+    
+    def worker() -> None:
+        while True:
+            args, slot = next_call()
+            if slot >= stop_at:
+                return
+            delay = slot - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            calls.append(timed_call(args, call_timeout))
+    
+    def background_worker(args: list[str]) -> None:
+        while time.monotonic() < stop_at:
+            background_calls.append(timed_call(args, call_timeout))
+    
+    threads = [threading.Thread(target=worker) for _ in range(max(1, concurrency))]
+    threads += [threading.Thread(target=background_worker, args=(args,)) for args in background]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    
+    def summarize(group: list[Dict[str, Any]]) -> Dict[str, Any]:
+        ms = [call["ms"] for call in group]
+        cpu_ms = [call["cpu_ms"] for call in group]
+        rss_mb = [call["rss_mb"] for call in group]
+        return {
+            "calls": len(group),
+            "errors": sum(1 for call in group if call["error"]),
+            "wallet_read_errors": sum(1 for call in group if call["wallet_error"]),
+            "p50_ms": metrics_store.percentile(ms, 0.50),
+            "p95_ms": metrics_store.percentile(ms, 0.95),
+            "p99_ms": metrics_store.percentile(ms, 0.99),
+            "max_ms": max(ms),
+            "cpu_ms_mean": round(sum(cpu_ms) / len(cpu_ms), 2),
+            "cpu_ms_p95": metrics_store.percentile(cpu_ms, 0.95),
+            "rss_mb_mean": round(sum(rss_mb) / len(rss_mb), 1),
+            "rss_mb_max": max(rss_mb)
+        }
+    
+    def by_command(group: list[Dict[str, Any]]) -> Dict[str, Any]:
+        names = sorted({call["command"] for call in group})
+        return {name: summarize([call for call in group if call["command"] == name]) for name in names}
+    
+    errors = [f"{call['command']}: {call['error']}" for call in calls + background_calls if call["error"]]
+    return {
+        "ok": not errors,
+        "duration_seconds": round(elapsed, 3),
+        "concurrency": concurrency,
+        "rate": rate or None,
+        "calls": len(calls),
+        "calls_per_second": round(len(calls) / elapsed, 2),
+        "commands": by_command(calls),
+        "background": by_command(background_calls),
+        "error_count": len(errors),
+        "errors": errors[:20]
+    }
+
+@app.command("load-test")
+def load_test(
+    command: Optional[List[str]] = typer.Option(None, "--command", help=f"Command line to fire (repeatable, default: {', '.join(LOAD_TEST_COMMANDS)})"),
+    concurrency: int = typer.Option(8, help="Calls in flight at once"),
+    rate: float = typer.Option(0, help="Calls started per second over all workers (0: as fast as the workers go)"),
+    duration: float = typer.Option(10, help="Seconds to keep firing"),
+    call_timeout: float = typer.Option(60, help="Seconds before a single call is killed"),
+    background: Optional[List[str]] = typer.Option(None, "--background", help="Command line re-run alongside the load, e.g. 'install' (repeatable)"),
+    output: Optional[str] = typer.Option(None, help="Also write the JSON report to this file")
+) -> None:
+    """Fire the hook-facing commands concurrently and report latency, CPU, RSS and errors as JSON"""
+    import shlex
+    
+    commands = [shlex.split(line) for line in (command or LOAD_TEST_COMMANDS)]
+    report = run_load_test(commands, concurrency, rate, duration, call_timeout,
+                           [shlex.split(line) for line in (background or [])])
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, 'w') as f:
+            f.write(text + "\n")
+    print(text)
+    if not report["ok"]:
+        raise typer.Exit(1)
+
+@app.command()
+def status_server(
+    socket_path: str = typer.Option(STATUS_SOCKET_PATH, help="Unix socket to serve HTTP on"),
+    ttl: float = typer.Option(LICENSE_CACHE_TTL, help="Seconds before the cached license status is refreshed")
+) -> None:
+    """Serve basic-status, license-status, service state and metrics over HTTP on a Unix socket"""
+    import signal
+    import socketserver
+    import threading
+    from http.server import BaseHTTPRequestHandler
+    from urllib.parse import urlsplit, parse_qs
+    
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            started = time.perf_counter()
+            url = urlsplit(self.path)
+            query = parse_qs(url.query)
+            content_type = "application/json"
+            if url.path == "/basic-status":
+                code, payload = 200, basic_status_data()
+            elif url.path == "/license-status":
+                try:
+                    request_ttl = float(query.get("ttl", [ttl])[0])
+                    if not 0 <= request_ttl < float("inf"):
+                        raise ValueError
+                except ValueError:
+                    code, payload = 400, {"error": f"invalid ttl '{query['ttl'][0]}', expected seconds as a number >= 0"}
+                else:
+                    payload = license_status_data(request_ttl)
+                    code = 200 if payload["cached"] else 503
+            elif url.path == "/license-history":
+                try:
+                    since = parse_since(query["since"][0]) if "since" in query else None
+                    last = int(query["last"][0]) if "last" in query else None
+                    code, payload = 200, license_history_data(since, last, "changes" in query)
+                except ValueError as e:
+                    code, payload = 400, {"error": str(e)}
+            elif url.path == "/service":
+                # systemctl only, so status hooks get the service state without starting Python
+                try:
+                    code, payload = 200, {"service": probe_service_state(5)}
+                except (OSError, RuntimeError, subprocess.TimeoutExpired) as e:
+                    code, payload = 503, {"error": str(e)}
+            elif url.path == "/health":
+                code, payload = 200, {"ok": True, "pid": os.getpid()}
+            elif url.path == "/metrics":
+                output_format = query.get("format", ["prometheus"])[0]
+                code, payload = 200, metrics_report(output_format)
+                if output_format != "json":
+                    content_type = "text/plain; version=0.0.4"
+            else:
+                code, payload = 404, {"error": f"unknown path {url.path}"}
+            body = (payload if isinstance(payload, str) else json.dumps(payload)).encode()
+            if url.path in ("/basic-status", "/license-status"):
+                metrics_store.observe("operation", f"http{url.path}", time.perf_counter() - started, code == 200)
+            self.send_response(code)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            # Unix socket peers have no address to log, and hooks poll every few seconds
+            pass
+    
+    class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+    
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    server = UnixHTTPServer(socket_path, Handler)
+    os.chmod(socket_path, 0o600)
+    
+    def shutdown(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+    
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    
+    typer.echo(f"🚀 Status server listening on {socket_path}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        typer.echo("👋 Status server stopped")
+
+def provision_instance(paths: InstancePaths, seed_dir: str, force: bool = False) -> Dict[str, Any]:
+    """Install one instance and create its wallet; failures are reported, not raised"""
+    started = time.monotonic()
+    report = {"root": paths.root, "ok": False}
+    try:
+        # New instance roots get their own copy of the extracted CLI package
+        if not os.path.exists(paths.cli_dir):
+            import shutil
+            # Seeds installed before the stamp moved to the root still carry one in the package
+            shutil.copytree(seed_dir, paths.cli_dir, ignore=shutil.ignore_patterns(".install-stamp.json*"))
+            report["seeded_from"] = seed_dir
+        
+        phase_started = time.monotonic()
+        install_report = run_install_script(paths, force=force)
+        metrics_store.observe("phase", "provision_install", time.monotonic() - phase_started)
+        report["install_seconds"] = round(time.monotonic() - phase_started, 3)
+        report["install_skipped"] = install_report["skipped"]
+        
+        if os.path.exists(paths.wallet_path):
+            report["wallet"] = "existing"
+        else:
+            phase_started = time.monotonic()
+            wallet_data = create_instance_wallet(paths)
+            report["wallet_seconds"] = round(time.monotonic() - phase_started, 3)
+            metrics_store.observe("phase", "provision_wallet", time.monotonic() - phase_started)
+            report["wallet"] = "created"
+            report["public_key"] = wallet_data["public_key"]
+        report["ok"] = True
+    except Exception as e:
+        report["error"] = str(e)
+    report["seconds"] = round(time.monotonic() - started, 3)
+    metrics_store.observe("operation", "provision_instance", time.monotonic() - started, report["ok"])
+    return report
+
+def instance_roots(instances: int, manifest: Optional[str]) -> list[str]:
+    """Instance roots from a manifest (JSON list of roots or {"root": ...} objects) or a count"""
+    if manifest:
+        with open(manifest, 'r') as f:
+            entries = json.load(f)
+        return [entry["root"] if isinstance(entry, dict) else str(entry) for entry in entries]
+    return [os.path.join(INSTANCES_DIR, f"instance-{i}") for i in range(1, instances + 1)]
+
+def provision_instances(roots: list[str], concurrency: int, seed_dir: str, force: bool = False) -> Dict[str, Any]:
+    """Provision many instance roots in parallel with at most `concurrency` at a time"""
+    from concurrent.futures import ThreadPoolExecutor
+    
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        results = list(pool.map(lambda root: provision_instance(InstancePaths(root), seed_dir, force), roots))
+    return {
+        "ok": all(result["ok"] for result in results),
+        "instances": results,
+        "concurrency": concurrency,
+        "total_seconds": round(time.monotonic() - started, 3),
         "timestamp": time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime())
     }
+
+class BootTimeline:
+    """Start and end offsets of each boot stage; stages that overlap show up as such"""
     
-    # Check wallet content if it exists
-    if status_data["wallet_exists"]:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.started_at = time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime())
+        self.stages = []
+    
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """Time a stage; an exception marks it failed, and the body may add details to the record"""
+        record = {"stage": name, "start": round(time.monotonic() - self.started, 3), "ok": True}
+        self.stages.append(record)
         try:
-            with open(WALLET_JSON_PATH, 'r') as f:
-                wallet_data = json.load(f)
-                status_data["wallet_has_keys"] = bool(wallet_data.get("private_key") and wallet_data.get("public_key"))
-                status_data["public_key_preview"] = wallet_data.get("public_key", "")[:8] + "..." if wallet_data.get("public_key") else None
-        except Exception as e:
-            status_data["wallet_error"] = str(e)
+            yield record
+        except BaseException as e:
+            record.update({"ok": False, "error": str(e) or type(e).__name__})
+            raise
+        finally:
+            record["end"] = round(time.monotonic() - self.started, 3)
+            record["seconds"] = round(record["end"] - record["start"], 3)
+            metrics_store.observe("phase", f"boot_{name}", record["seconds"], record["ok"])
     
-    # Print ONLY JSON for hooks to consume (no emojis or debug messages)
-    print(json.dumps(status_data, indent=2))
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "total_seconds": round(time.monotonic() - self.started, 3),
+            "stages": sorted(self.stages, key=lambda record: record["start"])
+        }
+
+async def boot_node(paths: InstancePaths, timeline: BootTimeline, force: bool = False,
+                    start_riptide: bool = True, heartbeat_timeout: float = 0) -> Dict[str, Any]:
+    """Install, create the wallet and start Riptide, overlapping what doesn't depend on each other.
+    
+    The CLI is only started once the install has finished, since install.sh
+    is what makes it usable. Once the keys are parsed the wallet is saved and
+    Riptide is started right away while the CLI exits in the background. An
+    existing valid wallet skips the CLI altogether.
+    """
+    loop = asyncio.get_running_loop()
+    result = {"wallet": "existing"}
+    with timeline.stage("wallet_check") as record:
+        wallet_data = load_valid_wallet(paths.wallet_path)
+        record["wallet"] = "existing" if wallet_data else "missing"
+    
+    with timeline.stage("install") as record:
+        install_report = await loop.run_in_executor(None, run_install_script, paths, force)
+        record.update({"skipped": install_report["skipped"], "phases": install_report["phases"]})
+    result["install_skipped"] = install_report["skipped"]
+    
+    session = None
+    exit_task = None
+    
+    async def exit_session(session: AsyncCheckerSession) -> None:
+        try:
+            with timeline.stage("cli_exit"):
+                await session.run_step("aethir exit")
+        finally:
+            await session.close()
+    
+    try:
+        if wallet_data is None:
+            session = AsyncCheckerSession(paths.cli_path)
+            with timeline.stage("cli_init"):
+                await session.start()
+                step = await session.run_step(TOS_STEP[0])
+                if not step["ready"]:
+                    reason = session.hang_reason or f"no prompt after {step['seconds']:.2f}s"
+                    raise RuntimeError(f"CLI not ready: {reason}")
+            
+            wallet_lock = wallet_store.WalletLock(paths.wallet_path)
+            try:
+                if await loop.run_in_executor(None, wallet_lock.acquire):
+                    wallet_data = load_valid_wallet(paths.wallet_path)
+                if wallet_data is None:
+                    with timeline.stage("wallet_create"):
+                        session.parser = WalletOutputParser()
+                        for command in ("aethir wallet create", "aethir wallet export"):
+                            if session.parser.complete:
+                                break
+                            if not (await session.run_step(command))["ready"]:
+                                raise RuntimeError(f"'{command}' not ready: {session.hang_reason or 'no prompt'}")
+                        wallet_data = session.parser.result()
+                        if not wallet_data:
+                            log.flush_ring("wallet keys not found")
+                            raise RuntimeError(f"no wallet keys in {session.capture.total_chars} chars of CLI output")
+                    
+                    with timeline.stage("wallet_save"):
+                        save_wallet_json(wallet_data, paths.wallet_path)
+                    result["wallet"] = "created"
+                else:
+                    # Another process created it while this one waited for the lock
+                    result["wallet"] = "created_concurrently"
+            finally:
+                wallet_lock.release()
+            result["public_key"] = wallet_data["public_key"]
+            # Nothing downstream needs the CLI any more
+            exit_task = asyncio.ensure_future(exit_session(session))
+        
+        if start_riptide:
+            with timeline.stage("riptide_start"):
+                # Reset the flag so the first heartbeat includes the wallet keys
+                if os.path.exists(WALLET_SENT_FLAG_PATH):
+                    os.remove(WALLET_SENT_FLAG_PATH)
+                process = await asyncio.create_subprocess_exec(
+                    "systemctl", "start", RIPTIDE_MANAGER_SERVICE,
+                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+                )
+                _, stderr = await process.communicate()
+                if process.returncode != 0:
+                    raise RuntimeError(f"could not start {RIPTIDE_MANAGER_SERVICE}: {stderr.decode().strip()}")
+            
+            if heartbeat_timeout > 0:
+                # hooks.js writes the flag once a heartbeat carried the keys
+                with timeline.stage("first_heartbeat") as record:
+                    sent = await loop.run_in_executor(
+                        None, wait_for_file, WALLET_SENT_FLAG_PATH,
+                        lambda path: True if os.path.exists(path) else None, heartbeat_timeout
+                    )
+                    record["ok"] = bool(sent)
+                result["heartbeat_confirmed"] = bool(sent)
+        
+        if exit_task is not None:
+            await exit_task
+        return result
+    finally:
+        if exit_task is None and session is not None:
+            await session.close()
+        elif exit_task is not None and not exit_task.done():
+            await asyncio.wait([exit_task])
+
+@app.command()
+def boot(
+    force: bool = typer.Option(False, "--force", help="Run the installer even if the install stamp is current"),
+    start_riptide: bool = typer.Option(True, help="Start the Riptide manager once the wallet is saved"),
+    heartbeat_timeout: float = typer.Option(90, help="Seconds to wait for the first heartbeat carrying the wallet (0: don't wait)"),
+    timeline_path: str = typer.Option(BOOT_TIMELINE_PATH, "--timeline", help="Where to write the boot timeline JSON")
+) -> None:
+    """Boot the node: install, wallet and Riptide as one pipeline, with a timeline"""
+    typer.echo("🚀 Booting Aethir node...")
+    timeline = BootTimeline()
+    ok = False
+    try:
+        with metrics_store.span("operation", "boot"):
+            result = asyncio.run(boot_node(InstancePaths.default(), timeline, force, start_riptide, heartbeat_timeout))
+        ok = True
+    except Exception as e:
+        result = {"error": str(e)}
+    
+    report = {"ok": ok, **result, **timeline.to_dict()}
+    os.makedirs(os.path.dirname(timeline_path), exist_ok=True)
+    json_files.atomic_write_json(timeline_path, report, indent=2)
+    
+    for record in report["stages"]:
+        mark = "✅" if record["ok"] else "❌"
+        typer.echo(f"   {mark} {record['stage']:<16} {record['start']:>8.2f}s → {record['end']:>8.2f}s  ({record['seconds']:.2f}s)")
+    if not ok:
+        typer.echo(f"❌ Boot failed after {report['total_seconds']:.2f}s: {result['error']} (timeline in {timeline_path})", err=True)
+        raise typer.Exit(1)
+    if result.get("heartbeat_confirmed") is False:
+        typer.echo(f"⚠️ No heartbeat with the wallet within {heartbeat_timeout:g}s, Riptide keeps trying")
+    typer.echo(f"🎉 Node booted in {report['total_seconds']:.2f}s (timeline in {timeline_path})")
 
 @app.command()
-def automate() -> None:
+def automate(
+    instances: int = typer.Option(0, help="Provision this many instances under the instances directory"),
+    manifest: Optional[str] = typer.Option(None, help="JSON file listing the instance roots to provision"),
+    concurrency: int = typer.Option(4, help="Instances provisioned at the same time"),
+    seed: str = typer.Option(os.path.dirname(AETHIR_CLI_PATH), help="Extracted CLI package copied into new instance roots"),
+    report: str = typer.Option(PROVISION_REPORT_PATH, help="Where to write the multi-instance JSON report"),
+    force: bool = typer.Option(False, "--force", help="Run the installer even if the install stamp is current")
+) -> None:
     """Full automation: install + create wallet"""
+    if instances or manifest:
+        roots = instance_roots(instances, manifest)
+        typer.echo(f"🚀 Provisioning {len(roots)} instances, {concurrency} at a time...")
+        summary = provision_instances(roots, concurrency, seed, force)
+        os.makedirs(os.path.dirname(report), exist_ok=True)
+        with open(report, 'w') as f:
+            json.dump(summary, f, indent=2)
+        typer.echo(json.dumps(summary, indent=2))
+        if not summary["ok"]:
+            typer.echo(f"❌ Some instances failed, see {report}", err=True)
+            raise typer.Exit(1)
+        typer.echo(f"🎉 {len(roots)} instances provisioned in {summary['total_seconds']:.1f}s")
+        return
+    
     typer.echo("🚀 Starting full Aethir automation...")
     
     try:
         # Step 1: Install
-        install()
+        install(force=force)
         
         # Step 2: Create wallet
         create_wallet()
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the automation, driven by the fake checker CLI
+Reports wallet creation latency, session throughput, parser throughput, status command latency,
+pipe vs pty transport cost and hook command latency under concurrent load, and fails when a result regresses past a saved baseline
+"""
+
+import argparse
+import asyncio
+import base64
+import contextlib
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPT_PATH = os.path.join(BENCH_DIR, "..", "aethir_automation.py")
+FAKE_CHECKER_PATH = os.path.join(BENCH_DIR, "fake_checker.py")
+
+# What the parsers must make of the fake checker's output: its default license
+# summary (3,2,1,0,0,6), the "none" summary, and the keys FAKE_CHECKER_WALLET pins
+EXPECTED_LICENSE = {"checking": 3, "ready": 2, "offline": 1, "banned": 0, "pending": 0, "total_delegated": 6,
+                    "status": "online", "online_total": 5, "offline_total": 1}
+EXPECTED_NO_LICENSES = {"checking": 0, "ready": 0, "offline": 0, "banned": 0, "pending": 0, "total_delegated": 0,
+                        "status": "ready_to_receive"}
+FAKE_WALLET = {
+    "private_key": base64.b64encode(b"aethir-benchmark-private-key-" * 4).decode(),
+    "public_key": "0123456789abcdef" * 2 + "01234567",
+}
+
+# Result name -> True when higher is better
+HIGHER_IS_BETTER = {
+    "sessions_per_second": True,
+    "wallet_parser_mb_per_second": True,
+    "license_parser_mb_per_second": True,
+    "stream_mb_per_second": True,
+    "calls_per_second": True,
+}
+
+
+def check_parsed(name: str, parsed, expected: dict) -> None:
+    """Fail the benchmark when a parser got any of the expected fields wrong"""
+    parsed = parsed or {}
+    wrong = [f"{field}={parsed.get(field)!r} (expected {value!r})"
+             for field, value in expected.items() if parsed.get(field) != value]
+    if wrong:
+        raise RuntimeError(f"{name} parsed wrong values: {', '.join(wrong)}")
+
+
+def latency_summary(samples_ms: list) -> dict:
+    # main() puts the automation's directory on sys.path
+    from metrics_store import percentile
+    
+    return {
+        "median_ms": round(statistics.median(samples_ms), 2),
+        "p95_ms": round(percentile(samples_ms, 0.95), 2),
+        "max_ms": round(max(samples_ms), 2),
+    }
+
+
+def run_script(script: str, env: dict, *args: str, stdin: str = None) -> float:
+    """Run one automation command and return its wall time in ms; raises on a non-zero exit"""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, script, *args],
+        input=stdin,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=env
+    )
+    elapsed = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} exited with {result.returncode}: {result.stderr.strip()[-500:]}")
+    return elapsed
+
+
+def bench_wallet(script: str, env: dict, runs: int) -> dict:
+    """End-to-end create-wallet, including interpreter startup, TOS and initialization"""
+    env = dict(env, FAKE_CHECKER_WALLET=f"{FAKE_WALLET['private_key']},{FAKE_WALLET['public_key']}")
+    samples = []
+    for _ in range(runs):
+        if os.path.exists(env["AETHIR_WALLET_PATH"]):
+            os.remove(env["AETHIR_WALLET_PATH"])
+        samples.append(run_script(script, env, "create-wallet"))
+        with open(env["AETHIR_WALLET_PATH"], 'r') as f:
+            check_parsed("create-wallet", json.load(f), FAKE_WALLET)
+    return latency_summary(samples)
+
+
+def bench_sessions(automation, sessions: int) -> dict:
+    """Concurrent one-shot license summary sessions on one event loop"""
+    jobs = [
+        {"cli_path": automation.AETHIR_CLI_PATH, "command": "aethir license summary",
+         "parser": automation.LicenseOutputParser()}
+        for _ in range(sessions)
+    ]
+    started = time.perf_counter()
+    results = asyncio.run(automation.run_sessions(jobs, timeout=60))
+    elapsed = time.perf_counter() - started
+    failures = [result for result in results if not result["ok"]]
+    if failures:
+        raise RuntimeError(f"{len(failures)} of {sessions} sessions failed: {failures[0]['error']}")
+    for job in jobs:
+        check_parsed("license session", job["parser"].result(), EXPECTED_LICENSE)
+    
+    job = {"cli_path": automation.AETHIR_CLI_PATH, "command": "aethir license summary",
+           "parser": automation.LicenseOutputParser()}
+    with fake_settings(LICENSE="none"):
+        asyncio.run(automation.run_sessions([job], timeout=60))
+    check_parsed("no-licenses session", job["parser"].result(), EXPECTED_NO_LICENSES)
+    return {
+        "sessions": sessions,
+        "sessions_per_second": round(sessions / elapsed, 2),
+        "session_latency": latency_summary([result["seconds"] * 1000 for result in results]),
+    }
+
+
+@contextlib.contextmanager
+def fake_settings(**values):
+    """Temporarily set FAKE_CHECKER_* variables for CLIs spawned by this process"""
+    saved = {name: os.environ.get(f"FAKE_CHECKER_{name}") for name in values}
+    os.environ.update({f"FAKE_CHECKER_{name}": str(value) for name, value in values.items()})
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(f"FAKE_CHECKER_{name}", None)
+            else:
+                os.environ[f"FAKE_CHECKER_{name}"] = value
+
+
+def run_one_session(automation, transport: str, command: str = "aethir license summary") -> dict:
+    job = {"cli_path": automation.AETHIR_CLI_PATH, "command": command, "transport": transport}
+    result = asyncio.run(automation.run_sessions([job], timeout=60))[0]
+    if not result["ok"]:
+        raise RuntimeError(f"{transport} session failed: {result['error']}")
+    return result
+
+
+def bench_transports(automation, runs: int, noise_lines: int) -> dict:
+    """One-shot session latency and output streaming throughput, over a pipe and over a pty.
+    
+    pty_block_buffered runs the pty against a fake that block-buffers when it
+    isn't writing to a terminal, like most stdio programs; over a pipe that
+    fake only shows its prompt at exit, so there is no pipe figure for it.
+    """
+    results = {}
+    for transport in ("pipe", "pty"):
+        samples = [run_one_session(automation, transport)["seconds"] * 1000 for _ in range(runs)]
+        session = automation.AsyncCheckerSession(automation.AETHIR_CLI_PATH, transport)
+        with fake_settings(NOISE_LINES=noise_lines):
+            started = time.perf_counter()
+            asyncio.run(session.run_command("aethir license summary", timeout=60))
+            elapsed = time.perf_counter() - started
+        results[transport] = {
+            "session_latency": latency_summary(samples),
+            "stream_mb_per_second": round(session.capture.total_chars / elapsed / (1024 * 1024), 1),
+        }
+    with fake_settings(BUFFERED=1):
+        samples = [run_one_session(automation, "pty")["seconds"] * 1000 for _ in range(runs)]
+    results["pty_block_buffered"] = {"session_latency": latency_summary(samples)}
+    return results
+
+
+def feed_chunks(parser, text: str, chunk_size: int = 4096) -> None:
+    for start in range(0, len(text), chunk_size):
+        parser.feed(text[start:start + chunk_size])
+    parser.close()
+
+
+def bench_parsers(automation, megabytes: float) -> dict:
+    """Parser throughput on large outputs with the interesting part at the very end"""
+    noise_line = "[INFO] 12:00:00 worker 3: heartbeat ok, 1234 tasks processed, queue depth 0\n"
+    noise = noise_line * max(1, int(megabytes * 1024 * 1024 / len(noise_line)))
+    wallet_text = noise + (
+        "Current private key:\n" + "*" * 39 + "\n" + FAKE_WALLET["private_key"] + "\n" + "*" * 39 + "\n"
+        "Current public key:\n" + "*" * 39 + "\n" + FAKE_WALLET["public_key"] + "\n" + "*" * 39 + "\nAethir> "
+    )
+    license_text = noise + "3  Checking\n2  Ready\n1  Offline\n0  Banned\n0  Pending\n6  Total Delegated\nAethir> "
+
+    results = {}
+    for name, parser_class, text, expected in (
+        ("wallet", automation.WalletOutputParser, wallet_text, FAKE_WALLET),
+        ("license", automation.LicenseOutputParser, license_text, EXPECTED_LICENSE),
+    ):
+        parser = parser_class()
+        started = time.perf_counter()
+        feed_chunks(parser, text)
+        elapsed = time.perf_counter() - started
+        if not parser.complete:
+            raise RuntimeError(f"{name} parser did not complete")
+        check_parsed(f"{name} parser", parser.result(), expected)
+        results[f"{name}_parser_mb_per_second"] = round(len(text) / elapsed / (1024 * 1024), 1)
+    
+    parser = automation.LicenseOutputParser()
+    feed_chunks(parser, "\nNo licenses delegated to your burner wallet\nAethir> ")
+    check_parsed("license parser", parser.result(), EXPECTED_NO_LICENSES)
+    return results
+
+
+def bench_status(script: str, env: dict, runs: int) -> dict:
+    """Latency of the hook-facing commands, with license-status served from a warm cache"""
+    run_script(script, env, "license-status")
+    results = {}
+    for command in ("basic-status", "status", "license-status", "metrics"):
+        results[command] = latency_summary([run_script(script, env, command) for _ in range(runs)])
+    return results
+
+
+def bench_load(automation, script: str, env: dict, duration: float, concurrency: int) -> dict:
+    """The load-test command against the hook-facing commands while wallet.json is replaced every few ms.
+    
+    Any reader that sees a torn or half-written wallet shows up as a
+    wallet read error, which fails the benchmark outright.
+    """
+    stop = threading.Event()
+    
+    def churn() -> None:
+        while not stop.is_set():
+            automation.wallet_store.write_wallet(
+                {"private_key": os.urandom(96).hex(), "public_key": os.urandom(20).hex()}, env["AETHIR_WALLET_PATH"]
+            )
+            time.sleep(0.005)
+    
+    writer = threading.Thread(target=churn)
+    writer.start()
+    try:
+        result = subprocess.run(
+            [sys.executable, script, "load-test", "--duration", str(duration), "--concurrency", str(concurrency)],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, env=env
+        )
+    finally:
+        stop.set()
+        writer.join()
+    try:
+        report = json.loads(result.stdout)
+    except ValueError:
+        raise RuntimeError(f"load-test exited with {result.returncode}: {result.stderr.strip()[-500:]}")
+    wallet_errors = sum(command["wallet_read_errors"] for command in report["commands"].values())
+    if wallet_errors:
+        raise RuntimeError(f"{wallet_errors} reads saw a broken wallet: {report['errors'][:3]}")
+    results = {"calls_per_second": report["calls_per_second"], "errors": report["error_count"]}
+    for name, command in report["commands"].items():
+        results[name] = {key: command[key] for key in ("p50_ms", "p95_ms", "p99_ms", "cpu_ms_mean", "rss_mb_max")}
+    return results
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> list:
+    """Results worse than the baseline by more than tolerance (a fraction)"""
+    current, previous = flatten(results), flatten(baseline)
+    worse = []
+    for name, value in current.items():
+        if name not in previous or not previous[name] or name.endswith(".sessions"):
+            continue
+        higher_is_better = HIGHER_IS_BETTER.get(name.rsplit(".", 1)[-1], False)
+        change = (value - previous[name]) / previous[name]
+        if (-change if higher_is_better else change) > tolerance:
+            worse.append(f"{name}: {previous[name]} -> {value}")
+    return worse
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--script", default=SCRIPT_PATH, help="aethir_automation.py to benchmark")
+    parser.add_argument("--runs", type=int, default=10, help="runs per latency measurement")
+    parser.add_argument("--sessions", type=int, default=20, help="concurrent sessions for the throughput run")
+    parser.add_argument("--parser-mb", type=float, default=20, help="size of the generated parser input")
+    parser.add_argument("--stream-lines", type=int, default=50000,
+                        help="log lines the fake prints for the transport streaming run")
+    parser.add_argument("--load-seconds", type=float, default=10, help="duration of the concurrent load run")
+    parser.add_argument("--load-concurrency", type=int, default=8, help="calls in flight during the load run")
+    parser.add_argument("--init-delay", type=float, default=0.05, help="fake CLI initialization delay in seconds")
+    parser.add_argument("--only", action="append", choices=["wallet", "sessions", "parsers", "status", "transport", "load"],
+                        help="run only these benchmarks (repeatable)")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed regression as a fraction")
+    args = parser.parse_args()
+    selected = args.only or ["wallet", "sessions", "parsers", "status", "transport", "load"]
+
+    scratch = tempfile.mkdtemp(prefix="aethir-bench-")
+    env = dict(os.environ)
+    env.update({
+        "AETHIR_CLI_PATH": FAKE_CHECKER_PATH,
+        "AETHIR_RUNTIME_DIR": os.path.join(scratch, "run"),
+        "AETHIR_WALLET_PATH": os.path.join(scratch, "wallet.json"),
+        "AETHIR_INSTALL_SCRIPT": os.path.join(scratch, "install.sh"),
+        "FAKE_CHECKER_INIT_DELAY": str(args.init_delay),
+    })
+    # The in-process benchmarks import the module after pointing it at the scratch setup
+    os.environ.update(env)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(args.script)))
+    import aethir_automation as automation
+
+    results = {}
+    try:
+        if "wallet" in selected:
+            results["create_wallet"] = bench_wallet(args.script, env, args.runs)
+        if "sessions" in selected:
+            results["sessions"] = bench_sessions(automation, args.sessions)
+        if "parsers" in selected:
+            results["parsers"] = bench_parsers(automation, args.parser_mb)
+        if "status" in selected:
+            results["status"] = bench_status(args.script, env, args.runs)
+        if "transport" in selected:
+            results["transport"] = bench_transports(automation, args.runs, args.stream_lines)
+        if "load" in selected:
+            results["load"] = bench_load(automation, args.script, env, args.load_seconds, args.load_concurrency)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    flat = flatten(results)
+    width = max((len(name) for name in flat), default=0) + 2
+    for name, value in flat.items():
+        print(f"{name:<{width}}{value:>12}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            worse = regressions(results, json.load(f), args.tolerance)
+        if worse:
+            print(f"❌ Regressed more than {args.tolerance:.0%} against {args.baseline}:")
+            for line in worse:
+                print(f"   {line}")
+            return 1
+        print(f"✅ No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Scripted stand-in for AethirCheckerCLI
+Speaks the same prompt protocol (TOS question, Aethir> prompt, wallet and license output)
+so the automation can be benchmarked and regression-tested without the real binary
+
+Behaviour is configured through environment variables, since the automation
+spawns the CLI without arguments:
+  FAKE_CHECKER_TOS=1            ask the Terms of Service question first (0: start at the prompt)
+  FAKE_CHECKER_INIT_DELAY=0.5   seconds spent "initializing" after the TOS answer
+  FAKE_CHECKER_RESPONSE_DELAY=0 seconds before each command's output
+  FAKE_CHECKER_CHUNK=0          write output in pieces of this many bytes (0: whole lines)
+  FAKE_CHECKER_CHUNK_DELAY=0    seconds between pieces
+  FAKE_CHECKER_NOISE_LINES=0    log lines printed before each command's output
+  FAKE_CHECKER_HANG=            hang forever at "startup", "init" or on the named command
+  FAKE_CHECKER_IGNORE_TERM=0    ignore SIGTERM, like a wedged binary
+  FAKE_CHECKER_BUFFERED=0       block-buffer stdout unless it is a terminal, like C stdio
+  FAKE_CHECKER_COLOR=0          color the prompt and labels with ANSI escapes on a terminal
+  FAKE_CHECKER_LICENSE=3,2,1,0,0,6  checking,ready,offline,banned,pending,total or "none"
+  FAKE_CHECKER_WALLET=          "private,public" keys to print instead of random ones
+"""
+
+import atexit
+import base64
+import io
+import os
+import signal
+import sys
+import time
+
+PROMPT = "Aethir> "
+STARS = "*" * 39
+LICENSE_ROWS = ["Checking", "Ready", "Offline", "Banned", "Pending", "Total Delegated"]
+
+
+def setting(name: str, default: str) -> str:
+    return os.environ.get(f"FAKE_CHECKER_{name}", default)
+
+
+CHUNK = int(setting("CHUNK", "0"))
+CHUNK_DELAY = float(setting("CHUNK_DELAY", "0"))
+HANG = setting("HANG", "")
+IS_TTY = sys.stdout.isatty()
+# Without a terminal a stdio program only flushes when its buffer fills or it exits.
+# Keep a buffer of our own so PYTHONUNBUFFERED can't change that
+FLUSH = IS_TTY or setting("BUFFERED", "0") != "1"
+STDOUT = sys.stdout.buffer if FLUSH else io.BufferedWriter(io.FileIO(sys.stdout.fileno(), 'wb', closefd=False), 4096)
+atexit.register(STDOUT.flush)
+COLOR = IS_TTY and setting("COLOR", "0") == "1"
+
+
+def out(text: str, end: str = "\n") -> None:
+    """Write to stdout, optionally split into small delayed pieces like a slow pty"""
+    data = (text + end).encode()
+    step = CHUNK or len(data) or 1
+    for start in range(0, len(data), step):
+        STDOUT.write(data[start:start + step])
+        if FLUSH:
+            STDOUT.flush()
+        if CHUNK_DELAY and start + step < len(data):
+            time.sleep(CHUNK_DELAY)
+
+
+def color(text: str, code: str) -> str:
+    return f"\x1b[{code}m{text}\x1b[0m" if COLOR else text
+
+
+def hang() -> None:
+    """Stop responding without exiting, keeping stdout open"""
+    while True:
+        time.sleep(3600)
+
+
+def wallet_output(keys: dict) -> None:
+    out("")
+    out(color("Current private key:", "1;33"))
+    out(STARS)
+    out(keys["private_key"])
+    out(STARS)
+    out(color("Current public key:", "1;32"))
+    out(STARS)
+    out(keys["public_key"])
+    out(STARS)
+
+
+def license_output() -> None:
+    counts = setting("LICENSE", "3,2,1,0,0,6")
+    out("")
+    if counts == "none":
+        out("No licenses delegated to your burner wallet")
+        return
+    for count, label in zip(counts.split(","), LICENSE_ROWS):
+        out(f"{count.strip()}  {color(label, '36')}")
+
+
+def main() -> int:
+    if "--version" in sys.argv:
+        out("AethirCheckerCLI 1.0.3.2 (fake)")
+        return 0
+    if setting("IGNORE_TERM", "0") == "1":
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    if HANG == "startup":
+        hang()
+
+    if setting("TOS", "1") == "1":
+        out("Do you accept the Terms of Service? (y/n)")
+        if sys.stdin.readline().strip() != "y":
+            out("Terms of Service not accepted")
+            return 1
+        out("Client is starting up...")
+        time.sleep(float(setting("INIT_DELAY", "0.5")))
+        if HANG == "init":
+            hang()
+        out("Initializing...")
+    out(color(PROMPT, "1;34"), end="")
+
+    keys = None
+    noise_lines = int(setting("NOISE_LINES", "0"))
+    response_delay = float(setting("RESPONSE_DELAY", "0"))
+    for line in sys.stdin:
+        command = line.strip()
+        if command and command == HANG:
+            hang()
+        if command and response_delay:
+            time.sleep(response_delay)
+        for i in range(noise_lines if command else 0):
+            out(f"[INFO] {time.strftime('%H:%M:%S')} worker {i % 8}: heartbeat ok, {i} tasks processed")
+
+        if command in ("aethir wallet create", "aethir wallet export"):
+            if keys is None or command == "aethir wallet create":
+                fixed = setting("WALLET", "")
+                if fixed:
+                    private_key, public_key = fixed.split(",")
+                    keys = {"private_key": private_key, "public_key": public_key}
+                else:
+                    keys = {
+                        "private_key": base64.b64encode(os.urandom(96)).decode(),
+                        "public_key": os.urandom(20).hex()
+                    }
+            wallet_output(keys)
+        elif command == "aethir license summary":
+            license_output()
+        elif command == "aethir version":
+            out("1.0.3.2")
+        elif command in ("aethir exit", "exit"):
+            out("Bye")
+            return 0
+        elif command and command != "y":
+            out(f"Unknown command: {command}")
+        out(color(PROMPT, "1;34"), end="")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Startup budget check for the hook-facing commands
+Runs each command under `python -X importtime` and fails when its import cost exceeds the budget
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "aethir_automation.py")
+
+# Import budget per command in milliseconds (sum of top-level cumulative import times)
+BUDGETS_MS = {
+    "basic-status": 40,
+    "status": 40,
+    "license-status": 40,
+}
+
+
+def import_cost_ms(stderr: str) -> float:
+    """Sum the cumulative time of top-level imports from -X importtime output"""
+    total_us = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line.split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue  # header line
+        # Nested imports are indented by two extra spaces per level
+        if fields[2].startswith("  "):
+            continue
+        total_us += int(fields[1])
+    return total_us / 1000
+
+
+def measure(script: str, command: str, runs: int) -> dict:
+    """Run one command repeatedly and return median import cost and wall time"""
+    imports, walls, failures = [], [], 0
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", script, *command.split()],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+        walls.append((time.perf_counter() - started) * 1000)
+        imports.append(import_cost_ms(result.stderr))
+        if result.returncode != 0:
+            failures += 1
+    return {
+        "import_ms": statistics.median(imports),
+        "wall_ms": statistics.median(walls),
+        "failures": failures
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--script", default=SCRIPT_PATH, help="aethir_automation.py to measure")
+    parser.add_argument("--runs", type=int, default=5, help="runs per command (median is reported)")
+    parser.add_argument("--budget", action="append", default=[], metavar="COMMAND=MS",
+                        help="override a command budget, e.g. --budget basic-status=25")
+    args = parser.parse_args()
+    
+    budgets = dict(BUDGETS_MS)
+    for override in args.budget:
+        command, _, value = override.partition("=")
+        budgets[command] = float(value)
+    
+    # license-status only stays on the fast path once a cached value exists
+    subprocess.run([sys.executable, args.script, "license-status"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    
+    over_budget = []
+    print(f"{'command':<20}{'imports ms':>12}{'wall ms':>10}{'budget ms':>11}  result")
+    for command, budget in budgets.items():
+        result = measure(args.script, command, args.runs)
+        ok = result["import_ms"] <= budget and not result["failures"]
+        if not ok:
+            over_budget.append(command)
+        verdict = "ok" if ok else ("FAILED" if result["failures"] else "OVER BUDGET")
+        print(f"{command:<20}{result['import_ms']:>12.1f}{result['wall_ms']:>10.1f}{budget:>11.0f}  {verdict}")
+    
+    if over_budget:
+        print(f"❌ Over budget: {', '.join(over_budget)}")
+        return 1
+    print("✅ All commands within their startup budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""
+JSON state files shared between processes
+Atomic replacement, so readers never see a partially written file
+"""
+
+from __future__ import annotations
+
+import json
+import os
+
+
+def atomic_write_json(path: str, data, indent: int | None = None, mode: int = 0o644, durable: bool = False) -> None:
+    """Replace path with data as JSON: write a temp file next to it, then rename it over path.
+
+    Readers see either the old contents or the new ones, never a truncated
+    file. With durable, the temp file and the rename are fsynced as well, so
+    the new contents survive a power loss.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp_path = os.path.join(directory, f".{os.path.basename(path)}.{os.getpid()}.tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=indent)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    if durable:
+        # Persist the rename itself
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
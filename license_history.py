@@ -0,0 +1,107 @@
+"""
+License status history for the checker node
+A fixed-size binary ring file of license summary samples, read through mmap
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import time
+
+MAGIC = b"AETHLH01"
+# magic, record size, capacity, samples appended so far
+HEADER = struct.Struct("<8sIIQ")
+# timestamp, checking, ready, offline, banned, pending, total_delegated, status code
+RECORD = struct.Struct("<d6IB3x")
+COUNT_FIELDS = ("checking", "ready", "offline", "banned", "pending", "total_delegated")
+# Index in this list is the status code stored on disk, so only ever append to it
+STATUSES = ["unknown", "online", "offline", "pending_approval", "no_licenses", "ready_to_receive"]
+DEFAULT_CAPACITY = 8192
+
+
+def _create(fd: int, capacity: int) -> None:
+    os.ftruncate(fd, HEADER.size + RECORD.size * capacity)
+    os.pwrite(fd, HEADER.pack(MAGIC, RECORD.size, capacity, 0), 0)
+
+
+def append(path: str, license_data: dict, timestamp: float | None = None,
+           capacity: int = DEFAULT_CAPACITY) -> None:
+    """Append one parsed license summary, overwriting the oldest sample once the ring is full"""
+    import fcntl
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        header = os.pread(fd, HEADER.size, 0)
+        if len(header) < HEADER.size or HEADER.unpack(header)[:2] != (MAGIC, RECORD.size):
+            _create(fd, capacity)
+            header = os.pread(fd, HEADER.size, 0)
+        _, _, capacity, count = HEADER.unpack(header)
+
+        status = license_data.get("status", "unknown")
+        record = RECORD.pack(
+            time.time() if timestamp is None else timestamp,
+            *(int(license_data.get(field, 0)) for field in COUNT_FIELDS),
+            STATUSES.index(status) if status in STATUSES else 0
+        )
+        os.pwrite(fd, record, HEADER.size + RECORD.size * (count % capacity))
+        # The count is written last, so readers never see a slot before its record
+        os.pwrite(fd, HEADER.pack(MAGIC, RECORD.size, capacity, count + 1), 0)
+    finally:
+        os.close(fd)
+
+
+def read(path: str) -> tuple[list[dict], int, int]:
+    """Return (samples oldest first, capacity, samples appended in total)"""
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return [], DEFAULT_CAPACITY, 0
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        if size < HEADER.size:
+            return [], DEFAULT_CAPACITY, 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            magic, record_size, capacity, count = HEADER.unpack_from(view, 0)
+            if magic != MAGIC or record_size != RECORD.size or size < HEADER.size + RECORD.size * capacity:
+                return [], DEFAULT_CAPACITY, 0
+            stored = min(count, capacity)
+            first = count - stored
+            samples = []
+            for index in range(first, count):
+                timestamp, *counts, status = RECORD.unpack_from(view, HEADER.size + RECORD.size * (index % capacity))
+                sample = {"timestamp": timestamp}
+                sample.update(zip(COUNT_FIELDS, counts))
+                sample["status"] = STATUSES[status] if status < len(STATUSES) else "unknown"
+                samples.append(sample)
+    return samples, capacity, count
+
+
+def changes(samples: list[dict]) -> list[dict]:
+    """Only the samples whose counts or status differ from the sample before them"""
+    changed = []
+    previous = None
+    for sample in samples:
+        key = tuple(sample[field] for field in COUNT_FIELDS) + (sample["status"],)
+        if key != previous:
+            changed.append(sample)
+        previous = key
+    return changed
+
+
+def time_in_status(samples: list[dict], status: str, since: float, until: float) -> float:
+    """Seconds within [since, until] during which the last known status was `status`.
+
+    Each sample's status is assumed to hold until the next sample; the sample
+    just before `since` decides the state at the start of the window.
+    """
+    total = 0.0
+    for sample, following in zip(samples, samples[1:] + [None]):
+        start = max(sample["timestamp"], since)
+        end = min(following["timestamp"] if following else until, until)
+        if sample["status"] == status and end > start:
+            total += end - start
+    return total
@@ -0,0 +1,222 @@
+"""
+Metrics store for phase and command timings
+Histograms are accumulated in memory and merged into a small JSON state file
+"""
+
+from __future__ import annotations
+
+import _thread
+import atexit
+import json
+import os
+import time
+
+# Upper bounds in seconds, the last bucket is +Inf
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+# metric -> (label name, help text)
+METRICS = {
+    "phase": ("phase", "Time spent in each phase of a checker CLI session, install or provisioning"),
+    "operation": ("operation", "End-to-end duration of automation commands and status queries"),
+}
+FLUSH_INTERVAL = 5.0
+
+# metric -> label value -> {"count", "sum", "min", "max", "failures", "buckets"}
+_pending = {}
+_lock = _thread.allocate_lock()
+_state_path = None
+_last_flush = 0.0
+
+
+def enable(path: str) -> None:
+    """Persist observations to path, at most every FLUSH_INTERVAL seconds and at exit"""
+    global _state_path, _last_flush
+    if _state_path is None:
+        atexit.register(flush)
+    _state_path = path
+    _last_flush = time.monotonic()
+
+
+def _empty() -> dict:
+    return {"count": 0, "sum": 0.0, "min": None, "max": None, "failures": 0, "buckets": [0] * (len(BUCKETS) + 1)}
+
+
+def _merge(into: dict, histogram: dict) -> None:
+    into["count"] += histogram["count"]
+    into["sum"] += histogram["sum"]
+    if histogram["count"]:
+        into["min"] = histogram["min"] if into["min"] is None else min(into["min"], histogram["min"])
+        into["max"] = histogram["max"] if into["max"] is None else max(into["max"], histogram["max"])
+    into["failures"] += histogram["failures"]
+    into["buckets"] = [a + b for a, b in zip(into["buckets"], histogram["buckets"])]
+
+
+def observe(metric: str, label: str, seconds: float, ok: bool = True) -> None:
+    """Record one duration; failures are counted but still land in the histogram"""
+    index = 0
+    while index < len(BUCKETS) and seconds > BUCKETS[index]:
+        index += 1
+    with _lock:
+        histogram = _pending.setdefault(metric, {}).get(label)
+        if histogram is None:
+            histogram = _pending[metric][label] = _empty()
+        histogram["count"] += 1
+        histogram["sum"] += seconds
+        histogram["min"] = seconds if histogram["min"] is None else min(histogram["min"], seconds)
+        histogram["max"] = seconds if histogram["max"] is None else max(histogram["max"], seconds)
+        histogram["buckets"][index] += 1
+        if not ok:
+            histogram["failures"] += 1
+    if _state_path is not None and time.monotonic() - _last_flush >= FLUSH_INTERVAL:
+        flush()
+
+
+class span:
+    """Context manager timing a block; an exception marks the observation as failed"""
+
+    def __init__(self, metric: str, label: str):
+        self.metric = metric
+        self.label = label
+        self.ok = True
+
+    def __enter__(self) -> "span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        ok = self.ok
+        if exc is not None:
+            # Exit exceptions (SystemExit, typer.Exit) carrying code 0 are not failures
+            exit_code = exc.code if isinstance(exc, SystemExit) else getattr(exc, "exit_code", 1)
+            ok = ok and exit_code in (0, None)
+        observe(self.metric, self.label, time.perf_counter() - self.started, ok)
+
+
+def flush() -> None:
+    """Merge pending observations into the state file under an exclusive lock.
+
+    Metrics must never break the command being measured, so a state file that
+    can't be written just drops the observations.
+    """
+    global _pending, _last_flush
+    import fcntl
+
+    with _lock:
+        pending, _pending = _pending, {}
+        _last_flush = time.monotonic()
+    if not pending or _state_path is None:
+        return
+    try:
+        os.makedirs(os.path.dirname(_state_path), exist_ok=True)
+        fd = os.open(_state_path, os.O_RDWR | os.O_CREAT, 0o644)
+    except OSError:
+        return
+    with os.fdopen(fd, 'r+') as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            state = json.load(f)
+        except ValueError:
+            state = {}
+        if state.get("buckets") != list(BUCKETS):
+            # Bucket layout changed (or new file): start over rather than mix layouts
+            state = {"buckets": list(BUCKETS), "started_at": time.time(), "metrics": {}}
+        for metric, labels in pending.items():
+            stored = state["metrics"].setdefault(metric, {})
+            for label, histogram in labels.items():
+                _merge(stored.setdefault(label, _empty()), histogram)
+        state["updated_at"] = time.time()
+        f.seek(0)
+        f.truncate()
+        json.dump(state, f)
+        f.flush()
+
+
+def load(path: str) -> dict:
+    """Read the state file, including this process's not yet flushed observations"""
+    import fcntl
+
+    try:
+        with open(path, 'r') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_SH)
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = {}
+    if state.get("buckets") != list(BUCKETS):
+        state = {"buckets": list(BUCKETS), "metrics": {}}
+    with _lock:
+        for metric, labels in _pending.items():
+            stored = state["metrics"].setdefault(metric, {})
+            for label, histogram in labels.items():
+                _merge(stored.setdefault(label, _empty()), histogram)
+    return state
+
+
+def quantile(histogram: dict, q: float) -> float | None:
+    """Estimate a quantile by linear interpolation inside the matching bucket.
+
+    Bucket edges are narrowed to the observed min and max, so sparse series
+    don't report values no observation came close to.
+    """
+    total = histogram["count"]
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for index, count in enumerate(histogram["buckets"]):
+        if count and seen + count >= rank:
+            lower = max(BUCKETS[index - 1] if index > 0 else 0.0, histogram["min"])
+            upper = min(BUCKETS[index] if index < len(BUCKETS) else histogram["max"], histogram["max"])
+            return round(lower + (upper - lower) * (rank - seen) / count, 4)
+        seen += count
+    return round(histogram["max"], 4)
+
+
+def percentile(samples: list, q: float) -> float | None:
+    """Nearest-rank percentile of raw samples, None without samples"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))]
+
+
+def summary(state: dict) -> dict:
+    """JSON-friendly view: count, failures, mean and p50/p95/p99 per series"""
+    result = {}
+    for metric, labels in state["metrics"].items():
+        result[metric] = {}
+        for label, histogram in sorted(labels.items()):
+            count = histogram["count"]
+            result[metric][label] = {
+                "count": count,
+                "failures": histogram["failures"],
+                "sum_seconds": round(histogram["sum"], 4),
+                "mean_seconds": round(histogram["sum"] / count, 4) if count else None,
+                "max_seconds": round(histogram["max"], 4) if count else None,
+                "p50_seconds": quantile(histogram, 0.50),
+                "p95_seconds": quantile(histogram, 0.95),
+                "p99_seconds": quantile(histogram, 0.99),
+            }
+    return {"updated_at": state.get("updated_at"), "started_at": state.get("started_at"), "metrics": result}
+
+
+def render_prometheus(state: dict) -> str:
+    """Prometheus text exposition format, one histogram and failure counter per metric"""
+    lines = []
+    for metric, labels in sorted(state["metrics"].items()):
+        label_name, help_text = METRICS.get(metric, (metric, metric))
+        name = f"aethir_{metric}_seconds"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for label, histogram in sorted(labels.items()):
+            cumulative = 0
+            for bound, count in zip(BUCKETS + (float("inf"),), histogram["buckets"]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{name}_bucket{{{label_name}="{label}",le="{le}"}} {cumulative}')
+            lines.append(f'{name}_sum{{{label_name}="{label}"}} {histogram["sum"]:.6f}')
+            lines.append(f'{name}_count{{{label_name}="{label}"}} {histogram["count"]}')
+        failures = f"aethir_{metric}_failures_total"
+        lines.append(f"# HELP {failures} Failed {label_name}s")
+        lines.append(f"# TYPE {failures} counter")
+        for label, histogram in sorted(labels.items()):
+            lines.append(f'{failures}{{{label_name}="{label}"}} {histogram["failures"]}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,125 @@
+"""
+Output capture for checker CLI sessions
+A fixed-size in-memory ring that spills older output to a temp file, read back through mmap
+"""
+
+from __future__ import annotations
+
+import collections
+
+DEFAULT_RING_SIZE = 256 * 1024
+DEFAULT_SPILL_LIMIT = 64 * 1024 * 1024
+
+
+class OutputCapture:
+    """Session output kept in a bounded ring, with the overflow optionally spilled to disk.
+
+    The newest ring_size characters stay in memory. Older chunks move to an
+    unlinked temp file until it holds spill_limit bytes; after that, or with
+    spill off, they are dropped and counted, so a runaway session keeps its
+    beginning and its end. The temp file goes away with the capture.
+    """
+
+    def __init__(self, ring_size: int = DEFAULT_RING_SIZE, spill: bool = True,
+                 spill_limit: int = DEFAULT_SPILL_LIMIT, spill_dir: str | None = None):
+        self.ring_size = ring_size
+        self.spill = spill
+        self.spill_limit = spill_limit
+        self.spill_dir = spill_dir
+        self.total_chars = 0
+        self.spilled_bytes = 0
+        self.spilled_chars = 0
+        self.dropped_chars = 0
+        self._ring = collections.deque()
+        self._ring_chars = 0
+        self._spill_file = None
+
+    def write(self, text: str) -> None:
+        if not text:
+            return
+        self._ring.append(text)
+        self._ring_chars += len(text)
+        self.total_chars += len(text)
+        while self._ring_chars > self.ring_size and len(self._ring) > 1:
+            chunk = self._ring.popleft()
+            self._ring_chars -= len(chunk)
+            self._evict(chunk)
+
+    def _evict(self, chunk: str) -> None:
+        data = chunk.encode("utf-8", errors="replace")
+        # Once anything was dropped the spill file must stop growing, it holds one contiguous prefix
+        if not self.spill or self.dropped_chars or self.spilled_bytes + len(data) > self.spill_limit:
+            self.dropped_chars += len(chunk)
+            return
+        if self._spill_file is None:
+            import tempfile
+
+            self._spill_file = tempfile.TemporaryFile(prefix="aethir-capture-", dir=self.spill_dir)
+        self._spill_file.write(data)
+        self.spilled_bytes += len(data)
+        self.spilled_chars += len(chunk)
+
+    def lines(self):
+        """Yield the captured lines oldest first, without line endings.
+
+        Spilled lines are read from the temp file through mmap, so reading
+        back a large capture never loads the whole spill into memory. A marker line stands
+        in for output that was dropped.
+        """
+        partial = ""
+        if self.spilled_bytes:
+            import mmap
+
+            self._spill_file.flush()
+            with mmap.mmap(self._spill_file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                start = 0
+                end = view.find(b"\n", start)
+                while end != -1:
+                    yield view[start:end].decode("utf-8", errors="replace")
+                    start = end + 1
+                    end = view.find(b"\n", start)
+                partial = view[start:].decode("utf-8", errors="replace")
+        if self.dropped_chars:
+            if partial:
+                yield partial
+                partial = ""
+            yield f"[... {self.dropped_chars} characters of output not kept ...]"
+        for chunk in list(self._ring):
+            parts = (partial + chunk).split("\n")
+            partial = parts.pop()
+            yield from parts
+        if partial:
+            yield partial
+
+    def text(self) -> str:
+        """Everything retained as one string; prefer lines() for large captures"""
+        return "\n".join(self.lines()) + ("\n" if self.tail().endswith("\n") else "")
+
+    def tail(self, chars: int = 4096) -> str:
+        """The last chars characters, straight from memory"""
+        pieces = []
+        wanted = chars
+        for chunk in reversed(self._ring):
+            if wanted <= 0:
+                break
+            pieces.append(chunk[-wanted:])
+            wanted -= len(chunk)
+        return "".join(reversed(pieces))
+
+    def stats(self) -> dict:
+        return {
+            "total_chars": self.total_chars,
+            "in_memory_chars": self._ring_chars,
+            "spilled_bytes": self.spilled_bytes,
+            "spilled_chars": self.spilled_chars,
+            "dropped_chars": self.dropped_chars
+        }
+
+    def close(self) -> None:
+        """Delete the spill file; the in-memory ring stays readable"""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+            self.dropped_chars += self.spilled_chars
+            self.spilled_chars = 0
+            self.spilled_bytes = 0
@@ -2,6 +2,96 @@ const { exec } = require('child_process');
 const fs = require('fs').promises;
 const path = require('path');
 const os = require('os');
+const net = require('net');
+const http = require('http');
+
+const CHECKER_SOCKET = '/run/aethir/checker.sock';
+const STATUS_SOCKET = '/run/aethir/status.sock';
+
+// GET a JSON document from the resident status server (aethir_automation.py status-server).
+// Resolves to null when the server is not running so callers can fall back to the Typer commands.
+function queryStatusServer(urlPath, timeoutMs) {
+  return new Promise((resolve) => {
+    const request = http.get({ socketPath: STATUS_SOCKET, path: urlPath, timeout: timeoutMs }, (response) => {
+      let body = '';
+      response.setEncoding('utf8');
+      response.on('data', (chunk) => { body += chunk; });
+      response.on('end', () => {
+        try {
+          resolve({ statusCode: response.statusCode, data: JSON.parse(body) });
+        } catch (error) {
+          resolve(null);
+        }
+      });
+    });
+    request.on('timeout', () => request.destroy());
+    request.on('error', () => resolve(null));
+  });
+}
+
+// One `hook-snapshot` run answers the fallbacks of every hook in a status cycle: its probes
+// (service state, basic/license status, CLI liveness, timings) run concurrently under one
+// deadline, and the parsed result is shared by hooks called within HOOK_SNAPSHOT_MAX_AGE_MS.
+const HOOK_SNAPSHOT_MAX_AGE_MS = 5000;
+let hookSnapshotCache = null;
+
+function getHookSnapshot(utils) {
+  const now = Date.now();
+  if (hookSnapshotCache && now - hookSnapshotCache.at < HOOK_SNAPSHOT_MAX_AGE_MS) {
+    return hookSnapshotCache.promise;
+  }
+  const promise = utils.execCommand('/usr/bin/python3 /root/aethir_automation.py hook-snapshot --deadline 8', {
+    timeout: 15000,
+    cwd: '/root'
+  })
+    .then((result) => JSON.parse(result.stdout))
+    .catch(() => null);
+  hookSnapshotCache = { at: now, promise };
+  return promise;
+}
+
+// Result of one hook-snapshot probe, or null when it failed or timed out
+function probeResult(snapshot, name) {
+  const probe = snapshot && snapshot.probes && snapshot.probes[name];
+  return probe && probe.ok ? probe.result : null;
+}
+
+// Timing summary (count, failures, p50/p95/p99 per phase and operation) from the
+// status server, falling back to the fast-start `metrics --format json` command.
+async function collectTimings(utils) {
+  const served = await queryStatusServer('/metrics?format=json', 2000);
+  if (served && served.statusCode === 200) {
+    return served.data.metrics;
+  }
+  return probeResult(await getHookSnapshot(utils), 'timings');
+}
+
+// Send one JSON-line request to the checker session daemon (aethir_automation.py serve).
+// Resolves to null when the daemon is not running so callers can fall back to spawning the CLI.
+function queryCheckerDaemon(request, timeoutMs) {
+  return new Promise((resolve) => {
+    let buffer = '';
+    const socket = net.createConnection(CHECKER_SOCKET);
+    const done = (value) => {
+      socket.destroy();
+      resolve(value);
+    };
+    socket.setTimeout(timeoutMs, () => done(null));
+    socket.on('error', () => done(null));
+    socket.on('connect', () => socket.write(JSON.stringify(request) + '\n'));
+    socket.on('data', (chunk) => {
+      buffer += chunk;
+      const newline = buffer.indexOf('\n');
+      if (newline !== -1) {
+        try {
+          done(JSON.parse(buffer.slice(0, newline)));
+        } catch (error) {
+          done(null);
+        }
+      }
+    });
+  });
+}
 
 module.exports = {
   installSecrets: async ({ logger }) => {
@@ -36,24 +126,24 @@ module.exports = {
     logger.debug('Checking Aethir Checker health via Typer');
     
     try {
-      // Use Typer to get license status for health check
-      const result = await utils.execCommand('/usr/bin/python3 /root/aethir_automation.py license-status', {
-        timeout: 30000, // 30 seconds timeout
-        cwd: '/root'
-      });
-      
-      if (result.exitCode === 0) {
-        // Parse the JSON output to check if we got valid data
-        const licenseData = JSON.parse(result.stdout);
-        logger.debug('Aethir health check passed via Typer', { status: licenseData.status });
+      // Ask the resident status server first, it answers without starting Python
+      const served = await queryStatusServer('/license-status', 5000);
+      if (served) {
+        logger.debug('Aethir health check via status server', { status: served.data.status });
+        return served.statusCode === 200;
+      }
+
+      // Fall back to the shared hook snapshot, which never blocks on the CLI
+      const licenseData = probeResult(await getHookSnapshot(utils), 'license_status');
+      if (licenseData && licenseData.cached) {
+        logger.debug('Aethir health check passed via hook snapshot', { status: licenseData.status });
         return true;
-      } else {
-        logger.warn('Aethir health check failed via Typer', {
-          exitCode: result.exitCode,
-          stderr: result.stderr
-        });
-        return false;
       }
+      logger.warn('Aethir health check failed via hook snapshot', {
+        status: licenseData ? licenseData.status : 'unavailable',
+        message: licenseData ? licenseData.message : undefined
+      });
+      return false;
     } catch (error) {
       logger.error('Health check error via Typer', { error: error.message });
       return false;
@@ -186,53 +276,37 @@ module.exports = {
 
       // Check Aethir basic status using Typer (avoiding hanging CLI)
       let aethirLicenseStatus = null;
-      try {
-        const result = await utils.execCommand('/usr/bin/python3 /root/aethir_automation.py basic-status', {
-          timeout: 10000, // Short timeout for basic status
-          cwd: '/root'
-        });
+      // Prefer the resident status server; only a miss pays for the shared hook snapshot
+      const [servedBasic, servedService] = await Promise.all([
+        queryStatusServer('/basic-status', 2000),
+        queryStatusServer('/service', 6000)
+      ]);
+      const serverHit = (served) => served && served.statusCode === 200;
+      const snapshot = serverHit(servedBasic) && serverHit(servedService) ? null : await getHookSnapshot(utils);
+      const basicData = serverHit(servedBasic) ? servedBasic.data : probeResult(snapshot, 'basic_status');
+      if (basicData) {
+        aethirLicenseStatus = {
+          ...basicData,
+          cli_accessible: basicData.cli_exists,
+          last_check: new Date().toISOString(),
+          note: "Using basic status due to CLI hanging issue"
+        };
         
-        if (result.exitCode === 0) {
-          // Parse the JSON output from Typer
-          const basicData = JSON.parse(result.stdout);
-          aethirLicenseStatus = {
-            ...basicData,
-            cli_accessible: basicData.cli_exists,
-            last_check: new Date().toISOString(),
-            note: "Using basic status due to CLI hanging issue"
-          };
-          
-          logger.info('Aethir basic status retrieved via Typer', aethirLicenseStatus);
-        } else {
-          logger.warn('Basic status command failed', { 
-            exitCode: result.exitCode, 
-            stderr: result.stderr,
-            stdout: result.stdout 
-          });
-          aethirLicenseStatus = {
-            cli_accessible: false,
-            error: result.stderr || 'Unknown error',
-            last_check: new Date().toISOString()
-          };
-        }
-      } catch (error) {
-        logger.error('Could not get Aethir basic status via Typer', { error: error.message });
+        logger.info('Aethir basic status retrieved via Typer', aethirLicenseStatus);
+      } else {
+        const error = snapshot ? snapshot.probes.basic_status.error : 'hook-snapshot unavailable';
+        logger.warn('Basic status command failed', { error });
         aethirLicenseStatus = {
           cli_accessible: false,
-          error: error.message,
+          error: error || 'Unknown error',
           last_check: new Date().toISOString()
         };
       }
 
-      // Check if Aethir service is running
-      let aethirServiceStatus = 'unknown';
-      try {
-        const result = await utils.execCommand('systemctl is-active aethir-checker.service', {
-          timeout: 5000
-        });
-        aethirServiceStatus = result.stdout.trim();
-      } catch (error) {
-        logger.warn('Could not check Aethir service status', { error: error.message });
+      // Check if Aethir service is running (systemctl is-active, via the server or the snapshot)
+      const aethirServiceStatus = (serverHit(servedService) ? servedService.data.service : probeResult(snapshot, 'service')) || 'unknown';
+      if (aethirServiceStatus === 'unknown') {
+        logger.warn('Could not check Aethir service status');
       }
 
       return {
@@ -314,24 +388,30 @@ module.exports = {
         return { alive: false, reason: 'No wallet' };
       }
       
-      // Quick Aethir CLI check
-      try {
-        const result = await utils.execCommand('/root/AethirCheckerCLI-linux/AethirCheckerCLI --version', {
-          timeout: 5000,
-          cwd: '/root'
-        });
-        
-        if (result.exitCode === 0) {
-          logger.debug('Probe successful - service is alive');
+      // Ask the session daemon first, it answers without spawning the CLI
+      const daemon = await queryCheckerDaemon({ op: 'ping' }, 1000);
+      if (daemon) {
+        if (daemon.session_alive) {
+          logger.debug('Probe successful - checker session is alive', { pid: daemon.pid });
           return { alive: true };
-        } else {
-          logger.warn('Probe failed - Aethir CLI not responding');
-          return { alive: false, reason: 'CLI not responding' };
         }
-      } catch (error) {
-        logger.warn('Probe failed - CLI check error', { error: error.message });
-        return { alive: false, reason: 'CLI check failed' };
+        logger.warn('Probe failed - checker session daemon has no live CLI');
+        return { alive: false, reason: 'CLI session not running' };
       }
+
+      // Quick Aethir CLI check (AethirCheckerCLI --version, from the snapshot)
+      const snapshot = await getHookSnapshot(utils);
+      const cli = probeResult(snapshot, 'cli');
+      if (cli && cli.alive) {
+        logger.debug('Probe successful - service is alive');
+        return { alive: true };
+      }
+      if (cli) {
+        logger.warn('Probe failed - Aethir CLI not responding');
+        return { alive: false, reason: 'CLI not responding' };
+      }
+      logger.warn('Probe failed - CLI check error', { error: snapshot ? snapshot.probes.cli.error : 'hook-snapshot unavailable' });
+      return { alive: false, reason: 'CLI check failed' };
     } catch (error) {
       logger.error('Probe hook error', { error: error.message });
       return { alive: false, error: error.message };
@@ -359,14 +439,36 @@ module.exports = {
         }
       };
 
-      // Add Aethir-specific metrics if possible
+      // Latency percentiles and failure counts recorded by aethir_automation.py
+      metrics.aethir_timings = await collectTimings(utils);
+
+      // License state over the last hour from the on-disk history, without touching the CLI
+      const served = await queryStatusServer('/license-history?since=1h&last=0', 2000);
+      const history = served && served.statusCode === 200
+        ? served.data
+        : probeResult(await getHookSnapshot(utils), 'license_history');
+      if (history) {
+        metrics.license_history = {
+          offline_seconds_last_hour: history.offline_seconds,
+          stored_samples: history.stored_samples
+        };
+      }
+
+      // Version and license summary from one CLI session; snapshot goes through the
+      // session daemon when it is running, so this usually starts no new CLI
       try {
-        const result = await utils.execCommand('/root/AethirCheckerCLI-linux/AethirCheckerCLI license summary', {
-          timeout: 10000,
+        const result = await utils.execCommand(
+          '/usr/bin/python3 /root/aethir_automation.py snapshot --command "aethir version" --command "aethir license summary" --timeout 10', {
+          timeout: 30000,
           cwd: '/root'
         });
+        const snapshot = JSON.parse(result.stdout);
         metrics.aethir = {
-          cli_accessible: result.exitCode === 0,
+          cli_accessible: snapshot.ok === true,
+          version: snapshot.version,
+          license: snapshot.license,
+          via: snapshot.via,
+          query_seconds: snapshot.total_seconds,
           last_check: new Date().toISOString()
         };
       } catch (error) {
@@ -0,0 +1,95 @@
+"""
+Wallet store for wallet.json
+A parsed-contents cache shared by every reader in the process, atomic durable writes and a lock for wallet creators
+"""
+
+from __future__ import annotations
+
+import json
+import os
+
+from json_files import atomic_write_json
+
+# path -> ((st_ino, st_mtime_ns, st_size), parsed wallet)
+_cache = {}
+
+
+def read_wallet(path: str) -> dict | None:
+    """Return a snapshot of the wallet at path, or None if there is no wallet.
+
+    The file is only parsed again when its inode, mtime or size changed since
+    the last read. Writers replace the file atomically, so the one open file
+    is always a complete wallet. Raises json.JSONDecodeError when the file is
+    not valid JSON; such contents are never cached.
+    """
+    try:
+        f = open(path, 'r')
+    except FileNotFoundError:
+        return None
+    with f:
+        # Key on the opened file, not the path, so a concurrent rename can't mix versions
+        st = os.fstat(f.fileno())
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        cached = _cache.get(path)
+        if cached is not None and cached[0] == key:
+            return dict(cached[1])
+        wallet_data = json.load(f)
+    if isinstance(wallet_data, dict):
+        _cache[path] = (key, wallet_data)
+        return dict(wallet_data)
+    return wallet_data
+
+
+def has_keys(wallet_data: dict | None) -> bool:
+    """True if the wallet holds both a private and a public key"""
+    return bool(isinstance(wallet_data, dict) and wallet_data.get("private_key") and wallet_data.get("public_key"))
+
+
+def write_wallet(wallet_data: dict, path: str) -> None:
+    """Replace the wallet atomically and durably, readable by root only"""
+    atomic_write_json(path, wallet_data, indent=2, mode=0o600, durable=True)
+    _cache.pop(path, None)
+
+
+class WalletLock:
+    """Exclusive advisory lock for changing the wallet at path, held by whoever creates a wallet.
+    
+    Readers never take it: writes are atomic renames, so a read always sees a
+    whole wallet. acquire() returns True when it had to wait for another
+    holder, in which case that holder may just have created the wallet.
+    Usable as a context manager or through acquire()/release().
+    """
+    
+    def __init__(self, path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        self.lock_path = os.path.join(directory, f".{os.path.basename(path)}.lock")
+        self.fd = None
+    
+    def acquire(self) -> bool:
+        import fcntl
+        
+        self.fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(self.fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return False
+        except BlockingIOError:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+            return True
+    
+    def release(self) -> None:
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+    
+    def __enter__(self) -> bool:
+        return self.acquire()
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+
+def remove_wallet(path: str) -> None:
+    """Delete the wallet and forget its cached contents"""
+    if os.path.exists(path):
+        os.remove(path)
+    _cache.pop(path, None)